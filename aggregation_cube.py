@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Precomputed state x district x source aggregation cube.
+One Parquet table under .snapshots/ holds, per (state, district, source):
+    records                 point sites of the source
+    steel_capacity_mtpa     sum of Capacity(MTPA) (Steel Plants)
+    bf_capacity_mtpa        sum of Quantity (Steel Plants with BF)
+    overlay_features        overlay features touching the district
+    overlay_area_km2        overlay area, each feature's area split evenly over its districts
+Point rows have kind "points" and source = the DATASETS name; overlay rows have
+kind "overlay" and source = the enhanced_*.geojson layer. Overlay districts
+and states come from the layer's mapping_*.json; a district is placed in the
+state it has among the point sources, else the feature's first state.
+
+The cube is stale when any point source, geocoded regions, layer or mapping
+file changes. It is built ahead of time (python aggregation_cube.py, also run
+at the end of preprocess_geojson_mappings.py), never on a dashboard request:
+summary panels filter a few hundred cube rows while it is current and fall
+back to the raw points while it is not.
+"""
+
+import glob
+import json
+import os
+import tempfile
+import threading
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from dataset_registry import DATASETS, load_details, load_points, points_version
+from geodesy import to_local_km
+from geojson_stream import iter_mapping
+from overlay_index import overlay_index
+from overlay_store import overlay_version
+from snapshot_cache import SNAPSHOT_DIR
+
+CUBE_FILE = os.path.join(SNAPSHOT_DIR, "aggregation_cube.parquet")
+CUBE_META = os.path.join(SNAPSHOT_DIR, "aggregation_cube.meta.json")
+CUBE_KEYS = ["kind", "source", "state", "district"]
+MEASURES = ["records", "steel_capacity_mtpa", "bf_capacity_mtpa", "overlay_features", "overlay_area_km2"]
+# Serializes builds between threads of one process
+_build_lock = threading.Lock()
+
+
+def overlay_layers():
+    return sorted(glob.glob("enhanced_*.geojson"))
+
+
+def mapping_file(geojson_file):
+    """mapping_*.json written by preprocess_geojson_mappings.py for a layer"""
+    return f"mapping_{geojson_file.replace('enhanced_', '').replace('.geojson', '.json')}"
+
+
+def _file_version(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def cube_version():
+    """Version key of everything the cube is built from"""
+    return json.loads(json.dumps({
+        "points": points_version(),
+        "layers": {layer: [overlay_version(layer), _file_version(mapping_file(layer))] for layer in overlay_layers()},
+    }))
+
+
+def _point_rows():
+    points = load_points()
+    frames = []
+    for source, spec in DATASETS.items():
+        rows = points[points["source_type"] == source]
+        frame = pd.DataFrame({
+            "source": source,
+            "state": rows["state"].astype(object).to_numpy(),
+            "district": rows["district"].astype(object).to_numpy(),
+            "records": 1,
+        })
+        details = load_details(source, rows["row_id"].to_numpy())
+        for measure, column in spec.get("measures", {}).items():
+            frame[measure] = pd.to_numeric(details[column], errors="coerce").to_numpy()
+        frames.append(frame)
+    cube = pd.concat(frames, ignore_index=True).groupby(["source", "state", "district"], dropna=False).sum(min_count=1)
+    return cube.reset_index().assign(kind="points")
+
+
+def _feature_areas(geojson_file):
+    """Area (km²) of every feature of a layer, measured in a local frame around each part"""
+    index = overlay_index(geojson_file)
+    geometries = index["geometries"]
+    centroids = shapely.centroid(geometries)
+    local = to_local_km(geometries, shapely.get_x(centroids), shapely.get_y(centroids))
+    n_features = len(index["overlay"]["geom_type"])
+    return np.bincount(index["part_feature"], weights=shapely.area(local), minlength=n_features)
+
+
+def _feature_regions(geojson_file, n_features):
+    """(districts, states) lists per feature from the layer's mapping file, else its properties"""
+    try:
+        mapping = dict(iter_mapping(mapping_file(geojson_file)))
+    except (OSError, ValueError):
+        mapping = {}
+    if len(mapping) == n_features:
+        return ([list(mapping[str(i)].get("districts", [])) for i in range(n_features)],
+                [list(mapping[str(i)].get("states", [])) for i in range(n_features)])
+    properties = overlay_index(geojson_file)["overlay"]["properties"]
+    columns = [properties[col] if col in properties.columns else pd.Series([None] * n_features)
+               for col in ["districts", "states"]]
+    return tuple([[] if v is None or isinstance(v, (str, float)) else list(v) for v in col] for col in columns)
+
+
+def _overlay_rows(district_states):
+    frames = []
+    for layer in overlay_layers():
+        areas = _feature_areas(layer)
+        districts, states = _feature_regions(layer, len(areas))
+        features = pd.DataFrame({"feature": np.arange(len(areas)), "district": districts,
+                                 "first_state": [s[0] if s else None for s in states]})
+        features["share"] = areas / np.maximum([len(d) for d in districts], 1)
+        features = features.explode("district")
+        features["state"] = features["district"].map(district_states).fillna(features["first_state"])
+        cube = features.groupby(["state", "district"], dropna=False).agg(
+            overlay_features=("feature", "nunique"), overlay_area_km2=("share", "sum"))
+        frames.append(cube.reset_index().assign(kind="overlay", source=layer))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=CUBE_KEYS)
+
+
+def _write_atomic(path, write):
+    """Call write(tmp_path) on a private temporary file next to path, then move it into place"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def build_cube():
+    """Aggregate every point source and overlay layer and write the cube; returns it"""
+    # Taken before reading, so inputs changing mid-build leave the cube stale rather than mislabelled
+    version = cube_version()
+    points = _point_rows()
+    known = points.dropna(subset=["state", "district"])
+    district_states = known.groupby("district")["state"].agg(lambda s: s.mode().iloc[0])
+    cube = pd.concat([points, _overlay_rows(district_states)], ignore_index=True)
+    for measure in MEASURES:
+        if measure not in cube.columns:
+            cube[measure] = np.nan
+    cube = cube[CUBE_KEYS + MEASURES]
+    cube["records"] = cube["records"].fillna(0).astype("int64")
+    cube["overlay_features"] = cube["overlay_features"].fillna(0).astype("int64")
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    _write_atomic(CUBE_FILE, lambda tmp_path: cube.to_parquet(tmp_path, index=False))
+
+    def write_meta(tmp_path):
+        with open(tmp_path, "w") as f:
+            json.dump(version, f)
+
+    _write_atomic(CUBE_META, write_meta)
+    return cube
+
+
+def _is_fresh(version):
+    try:
+        with open(CUBE_META, "r") as f:
+            return json.load(f) == version and os.path.exists(CUBE_FILE)
+    except (OSError, ValueError):
+        return False
+
+
+@lru_cache(maxsize=2)
+def _read_cube(version_text):
+    return pd.read_parquet(CUBE_FILE)
+
+
+def load_cube(build=True):
+    """
+    The aggregation cube (shared, do not mutate). A cube whose inputs changed
+    is rebuilt first, or None is returned instead when build is False.
+    """
+    version = cube_version()
+    if not _is_fresh(version):
+        if not build:
+            return None
+        with _build_lock:
+            # Threads that waited for the lock reuse the cube the first one built
+            if not _is_fresh(version):
+                build_cube()
+    return _read_cube(json.dumps(version, sort_keys=True))
+
+
+def cube_slice(kind, sources=None, states=None, districts=None):
+    """
+    Cube rows of a kind, optionally restricted to sources / states / districts
+    (like the dashboard filters). None when the cube is missing, stale or
+    unreadable, so callers summarise the raw rows instead; never builds it.
+    """
+    try:
+        cube = load_cube(build=False)
+    except (OSError, ValueError):
+        return None
+    if cube is None:
+        return None
+    mask = cube["kind"] == kind
+    if sources:
+        mask &= cube["source"].isin(sources)
+    if states:
+        mask &= cube["state"].isin(states)
+    if districts:
+        mask &= cube["district"].isin(districts)
+    return cube[mask]
+
+
+if __name__ == "__main__":
+    cube = build_cube()
+    print(f"✅ Aggregation cube written to {CUBE_FILE} ({len(cube)} rows)")
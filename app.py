@@ -1,317 +1,34 @@
-import plotly.express as px
+import time
+_import_start = time.perf_counter()
 import pandas as pd
-import math
+import numpy as np
 import streamlit as st
-import json
 import os
-from PIL import Image
-import base64
-import streamlit.components.v1 as components
-from streamlit_pdf_viewer import pdf_viewer
+from aggregation_cube import cube_slice
+from catchment import CATCHMENT_RADII_KM, PLANT_SOURCES, catchment_districts, catchment_table
+from dataset_registry import DATASETS, hover_data, invalid_coordinates, load_details, load_points, memory_report
+from detail_cards import card_payloads
+from geodesy import packed_geodesic_rings
+from overlay_index import site_overlay_flags
+from overlay_store import level_for_zoom, load_overlay
+from overlay_traces import overlay_traces
+from point_clusters import cluster_points
+from point_filters import filter_points
+from region_rules import centroid_regions
+from startup_profile import timed
+from supplier_index import SUPPLIER_SOURCES, top_suppliers
+# Section-specific dependencies (plotly, streamlit_pdf_viewer) are imported inside their sections
+stage_times = {"Module imports": time.perf_counter() - _import_start}
 
 def get_location_info_from_coords(polygon):
     """
-    Enhanced function to estimate location based on polygon centroid coordinates
-    Maps coordinates to actual Indian states and major districts
+    Estimate districts and states from a polygon's centroid using the
+    "detailed" box rules in region_rules.json (see region_rules.centroid_regions
+    for whole arrays of polygons)
     """
     try:
-        centroid = polygon.centroid
-        lat, lon = centroid.y, centroid.x
-        
-        # Detailed coordinate-based state and district identification for India
-        
-        # Rajasthan
-        if 24.0 <= lat <= 30.2 and 69.5 <= lon <= 78.2:
-            districts = []
-            if 26.8 <= lat <= 28.4 and 75.0 <= lon <= 76.8:
-                districts = ["Jaipur", "Alwar", "Sikar"]
-            elif 24.3 <= lat <= 26.0 and 70.9 <= lon <= 73.8:
-                districts = ["Jodhpur", "Barmer", "Jaisalmer"]
-            elif 27.0 <= lat <= 28.9 and 73.0 <= lon <= 75.5:
-                districts = ["Bikaner", "Ganganagar", "Hanumangarh"]
-            elif 24.0 <= lat <= 25.8 and 73.7 <= lon <= 75.8:
-                districts = ["Udaipur", "Rajsamand", "Dungarpur"]
-            else:
-                districts = ["Central Rajasthan"]
-            return districts, ["Rajasthan"]
-        
-        # Gujarat
-        elif 20.1 <= lat <= 24.7 and 68.2 <= lon <= 74.5:
-            districts = []
-            if 22.2 <= lat <= 23.8 and 72.0 <= lon <= 73.2:
-                districts = ["Ahmedabad", "Gandhinagar", "Mehsana"]
-            elif 21.1 <= lat <= 22.3 and 70.0 <= lon <= 72.1:
-                districts = ["Rajkot", "Jamnagar", "Porbandar"]
-            elif 20.9 <= lat <= 21.9 and 72.7 <= lon <= 73.2:
-                districts = ["Surat", "Navsari", "Valsad"]
-            elif 22.7 <= lat <= 24.2 and 68.8 <= lon <= 71.8:
-                districts = ["Kutch", "Banaskantha", "Patan"]
-            else:
-                districts = ["Central Gujarat"]
-            return districts, ["Gujarat"]
-        
-        # Maharashtra
-        elif 15.6 <= lat <= 22.0 and 72.6 <= lon <= 80.9:
-            districts = []
-            if 18.8 <= lat <= 19.3 and 72.7 <= lon <= 73.2:
-                districts = ["Mumbai", "Mumbai Suburban", "Thane"]
-            elif 18.4 <= lat <= 18.7 and 73.7 <= lon <= 74.0:
-                districts = ["Pune", "Pimpri-Chinchwad"]
-            elif 19.7 <= lat <= 21.2 and 78.0 <= lon <= 79.3:
-                districts = ["Nagpur", "Wardha", "Chandrapur"]
-            elif 19.0 <= lat <= 20.3 and 74.7 <= lon <= 76.0:
-                districts = ["Aurangabad", "Jalna", "Beed"]
-            else:
-                districts = ["Central Maharashtra"]
-            return districts, ["Maharashtra"]
-        
-        # Karnataka
-        elif 11.5 <= lat <= 18.5 and 74.0 <= lon <= 78.6:
-            districts = []
-            if 12.8 <= lat <= 13.2 and 77.4 <= lon <= 77.8:
-                districts = ["Bangalore Urban", "Bangalore Rural"]
-            elif 15.3 <= lat <= 15.9 and 75.0 <= lon <= 75.8:
-                districts = ["Belgaum", "Bagalkot", "Bijapur"]
-            elif 13.3 <= lat <= 14.5 and 74.8 <= lon <= 75.8:
-                districts = ["Mysore", "Mandya", "Hassan"]
-            elif 14.4 <= lat <= 15.6 and 76.0 <= lon <= 77.6:
-                districts = ["Bellary", "Raichur", "Koppal"]
-            else:
-                districts = ["Central Karnataka"]
-            return districts, ["Karnataka"]
-        
-        # Tamil Nadu
-        elif 8.1 <= lat <= 13.6 and 76.2 <= lon <= 80.3:
-            districts = []
-            if 12.8 <= lat <= 13.2 and 79.8 <= lon <= 80.3:
-                districts = ["Chennai", "Kanchipuram", "Tiruvallur"]
-            elif 10.7 <= lat <= 11.1 and 76.9 <= lon <= 77.8:
-                districts = ["Coimbatore", "Tirupur", "Erode"]
-            elif 9.9 <= lat <= 10.8 and 78.0 <= lon <= 78.8:
-                districts = ["Madurai", "Theni", "Dindigul"]
-            elif 11.8 <= lat <= 12.5 and 79.0 <= lon <= 79.9:
-                districts = ["Vellore", "Tiruvannamalai", "Villupuram"]
-            else:
-                districts = ["Central Tamil Nadu"]
-            return districts, ["Tamil Nadu"]
-        
-        # Andhra Pradesh & Telangana
-        elif 12.6 <= lat <= 19.9 and 76.8 <= lon <= 84.8:
-            districts = []
-            if 17.2 <= lat <= 17.6 and 78.2 <= lon <= 78.7:
-                districts = ["Hyderabad", "Rangareddy", "Medchal"]
-                return districts, ["Telangana"]
-            elif 15.8 <= lat <= 17.1 and 79.7 <= lon <= 81.8:
-                districts = ["Visakhapatnam", "Vizianagaram", "Srikakulam"]
-                return districts, ["Andhra Pradesh"]
-            elif 14.4 <= lat <= 15.9 and 78.1 <= lon <= 80.0:
-                districts = ["Kurnool", "Anantapur", "Kadapa"]
-                return districts, ["Andhra Pradesh"]
-            elif 16.5 <= lat <= 19.0 and 77.3 <= lon <= 80.5:
-                districts = ["Warangal", "Karimnagar", "Nizamabad"]
-                return districts, ["Telangana"]
-            else:
-                districts = ["Central Region"]
-                return districts, ["Andhra Pradesh/Telangana"]
-        
-        # Kerala
-        elif 8.2 <= lat <= 12.8 and 74.9 <= lon <= 77.4:
-            districts = []
-            if 9.9 <= lat <= 10.0 and 76.2 <= lon <= 76.4:
-                districts = ["Kochi", "Ernakulam"]
-            elif 8.4 <= lat <= 8.9 and 76.8 <= lon <= 77.1:
-                districts = ["Thiruvananthapuram", "Kollam"]
-            elif 11.2 <= lat <= 11.6 and 75.7 <= lon <= 76.1:
-                districts = ["Kozhikode", "Malappuram", "Wayanad"]
-            elif 9.5 <= lat <= 10.5 and 76.0 <= lon <= 77.0:
-                districts = ["Kottayam", "Idukki", "Alappuzha"]
-            else:
-                districts = ["Central Kerala"]
-            return districts, ["Kerala"]
-        
-        # West Bengal
-        elif 21.5 <= lat <= 27.1 and 85.8 <= lon <= 89.9:
-            districts = []
-            if 22.4 <= lat <= 22.7 and 88.2 <= lon <= 88.5:
-                districts = ["Kolkata", "North 24 Parganas", "South 24 Parganas"]
-            elif 23.2 <= lat <= 25.6 and 87.8 <= lon <= 89.3:
-                districts = ["Darjeeling", "Jalpaiguri", "Cooch Behar"]
-            elif 23.8 <= lat <= 24.6 and 87.0 <= lon <= 88.8:
-                districts = ["Malda", "Murshidabad", "Birbhum"]
-            else:
-                districts = ["Central West Bengal"]
-            return districts, ["West Bengal"]
-        
-        # Odisha
-        elif 17.8 <= lat <= 22.6 and 81.4 <= lon <= 87.5:
-            districts = []
-            if 20.2 <= lat <= 20.4 and 85.7 <= lon <= 86.0:
-                districts = ["Bhubaneswar", "Khordha", "Puri"]
-            elif 21.4 <= lat <= 22.0 and 84.8 <= lon <= 85.8:
-                districts = ["Rourkela", "Sundargarh", "Jharsuguda"]
-            elif 19.2 <= lat <= 20.5 and 83.9 <= lon <= 85.2:
-                districts = ["Cuttack", "Jagatsinghpur", "Kendrapara"]
-            else:
-                districts = ["Central Odisha"]
-            return districts, ["Odisha"]
-        
-        # Madhya Pradesh
-        elif 21.1 <= lat <= 26.9 and 74.0 <= lon <= 82.8:
-            districts = []
-            if 23.1 <= lat <= 23.4 and 77.2 <= lon <= 77.6:
-                districts = ["Bhopal", "Sehore", "Raisen"]
-            elif 22.6 <= lat <= 23.0 and 75.7 <= lon <= 76.1:
-                districts = ["Indore", "Dewas", "Ujjain"]
-            elif 24.5 <= lat <= 25.9 and 78.0 <= lon <= 80.4:
-                districts = ["Jabalpur", "Katni", "Narsinghpur"]
-            elif 24.0 <= lat <= 25.4 and 81.2 <= lon <= 82.8:
-                districts = ["Rewa", "Satna", "Sidhi"]
-            else:
-                districts = ["Central Madhya Pradesh"]
-            return districts, ["Madhya Pradesh"]
-        
-        # Uttar Pradesh
-        elif 23.9 <= lat <= 30.4 and 77.1 <= lon <= 84.6:
-            districts = []
-            if 28.4 <= lat <= 28.8 and 77.0 <= lon <= 77.4:
-                districts = ["New Delhi", "Ghaziabad", "Gautam Buddha Nagar"]
-            elif 26.8 <= lat <= 27.2 and 80.8 <= lon <= 81.0:
-                districts = ["Lucknow", "Unnao", "Rae Bareli"]
-            elif 25.3 <= lat <= 25.5 and 82.9 <= lon <= 83.1:
-                districts = ["Varanasi", "Chandauli", "Jaunpur"]
-            elif 27.1 <= lat <= 27.3 and 78.0 <= lon <= 78.2:
-                districts = ["Agra", "Mathura", "Firozabad"]
-            else:
-                districts = ["Central Uttar Pradesh"]
-            return districts, ["Uttar Pradesh"]
-        
-        # Punjab
-        elif 29.5 <= lat <= 32.5 and 73.9 <= lon <= 76.9:
-            districts = []
-            if 31.6 <= lat <= 31.8 and 74.8 <= lon <= 75.0:
-                districts = ["Amritsar", "Tarn Taran", "Gurdaspur"]
-            elif 30.3 <= lat <= 30.5 and 75.8 <= lon <= 76.0:
-                districts = ["Ludhiana", "Jalandhar", "Kapurthala"]
-            elif 30.9 <= lat <= 31.1 and 75.3 <= lon <= 75.5:
-                districts = ["Patiala", "Fatehgarh Sahib", "Sangrur"]
-            else:
-                districts = ["Central Punjab"]
-            return districts, ["Punjab"]
-        
-        # Haryana
-        elif 27.7 <= lat <= 30.9 and 74.5 <= lon <= 77.6:
-            districts = []
-            if 28.4 <= lat <= 28.6 and 76.9 <= lon <= 77.1:
-                districts = ["Gurugram", "Faridabad", "Palwal"]
-            elif 29.1 <= lat <= 29.3 and 76.0 <= lon <= 76.2:
-                districts = ["Hisar", "Fatehabad", "Sirsa"]
-            elif 28.8 <= lat <= 29.0 and 76.6 <= lon <= 76.8:
-                districts = ["Rohtak", "Jhajjar", "Sonipat"]
-            else:
-                districts = ["Central Haryana"]
-            return districts, ["Haryana"]
-        
-        # Jharkhand
-        elif 21.9 <= lat <= 25.3 and 83.3 <= lon <= 87.6:
-            districts = []
-            if 23.3 <= lat <= 23.5 and 85.2 <= lon <= 85.4:
-                districts = ["Ranchi", "Khunti", "Lohardaga"]
-            elif 22.7 <= lat <= 22.9 and 86.1 <= lon <= 86.3:
-                districts = ["Jamshedpur", "East Singhbhum", "West Singhbhum"]
-            elif 24.6 <= lat <= 24.8 and 85.9 <= lon <= 86.1:
-                districts = ["Dhanbad", "Bokaro", "Giridih"]
-            else:
-                districts = ["Central Jharkhand"]
-            return districts, ["Jharkhand"]
-        
-        # Chhattisgarh
-        elif 17.8 <= lat <= 24.1 and 80.2 <= lon <= 84.4:
-            districts = []
-            if 21.2 <= lat <= 21.4 and 81.5 <= lon <= 81.7:
-                districts = ["Raipur", "Durg", "Bilaspur"]
-            elif 19.0 <= lat <= 19.2 and 81.9 <= lon <= 82.1:
-                districts = ["Jagdalpur", "Bastar", "Kondagaon"]
-            else:
-                districts = ["Central Chhattisgarh"]
-            return districts, ["Chhattisgarh"]
-        
-        # Bihar
-        elif 24.3 <= lat <= 27.5 and 83.3 <= lon <= 88.1:
-            districts = []
-            if 25.5 <= lat <= 25.7 and 85.0 <= lon <= 85.2:
-                districts = ["Patna", "Nalanda", "Jehanabad"]
-            elif 26.1 <= lat <= 26.3 and 85.1 <= lon <= 85.3:
-                districts = ["Muzaffarpur", "Sitamarhi", "Sheohar"]
-            else:
-                districts = ["Central Bihar"]
-            return districts, ["Bihar"]
-        
-        # Assam and Northeast
-        elif 24.1 <= lat <= 28.2 and 89.7 <= lon <= 97.1:
-            districts = []
-            if 26.1 <= lat <= 26.3 and 91.7 <= lon <= 91.9:
-                districts = ["Guwahati", "Kamrup", "Nalbari"]
-                return districts, ["Assam"]
-            elif 25.5 <= lat <= 25.7 and 91.8 <= lon <= 92.0:
-                districts = ["Shillong", "East Khasi Hills", "West Khasi Hills"]
-                return districts, ["Meghalaya"]
-            elif 23.7 <= lat <= 24.7 and 91.2 <= lon <= 92.7:
-                districts = ["Agartala", "West Tripura", "Sepahijala"]
-                return districts, ["Tripura"]
-            elif 25.1 <= lat <= 27.7 and 93.2 <= lon <= 97.4:
-                districts = ["Itanagar", "Papum Pare", "Lower Subansiri"]
-                return districts, ["Arunachal Pradesh"]
-            else:
-                districts = ["Northeast Region"]
-                return districts, ["Northeast States"]
-        
-        # Himachal Pradesh
-        elif 30.2 <= lat <= 33.2 and 75.6 <= lon <= 79.0:
-            districts = []
-            if 31.1 <= lat <= 31.3 and 77.1 <= lon <= 77.3:
-                districts = ["Shimla", "Solan", "Sirmaur"]
-            elif 32.2 <= lat <= 32.4 and 76.3 <= lon <= 76.5:
-                districts = ["Dharamshala", "Kangra", "Hamirpur"]
-            else:
-                districts = ["Central Himachal Pradesh"]
-            return districts, ["Himachal Pradesh"]
-        
-        # Uttarakhand
-        elif 28.4 <= lat <= 31.5 and 77.6 <= lon <= 81.0:
-            districts = []
-            if 30.3 <= lat <= 30.5 and 78.0 <= lon <= 78.2:
-                districts = ["Dehradun", "Tehri Garhwal", "Pauri Garhwal"]
-            elif 29.2 <= lat <= 29.4 and 79.5 <= lon <= 79.7:
-                districts = ["Nainital", "Almora", "Pithoragarh"]
-            else:
-                districts = ["Central Uttarakhand"]
-            return districts, ["Uttarakhand"]
-        
-        # Jammu & Kashmir / Ladakh
-        elif 32.3 <= lat <= 37.1 and 73.3 <= lon <= 80.3:
-            districts = []
-            if 34.0 <= lat <= 34.2 and 74.7 <= lon <= 74.9:
-                districts = ["Srinagar", "Budgam", "Ganderbal"]
-                return districts, ["Jammu & Kashmir"]
-            elif 32.7 <= lat <= 32.9 and 74.8 <= lon <= 75.0:
-                districts = ["Jammu", "Samba", "Kathua"]
-                return districts, ["Jammu & Kashmir"]
-            elif 34.1 <= lat <= 34.3 and 77.5 <= lon <= 77.7:
-                districts = ["Leh", "Kargil"]
-                return districts, ["Ladakh"]
-            else:
-                districts = ["Northern Region"]
-                return districts, ["Jammu & Kashmir/Ladakh"]
-        
-        # Goa
-        elif 15.0 <= lat <= 15.8 and 73.7 <= lon <= 74.3:
-            districts = ["North Goa", "South Goa"]
-            return districts, ["Goa"]
-        
-        # Default case for coordinates not matching any state
-        else:
-            return ["Region Unknown"], ["State Unknown"]
-            
+        regions = centroid_regions([polygon], "detailed")
+        return list(regions.at[0, "districts"]), list(regions.at[0, "states"])
     except Exception as e:
         return ["Region Unknown"], ["State Unknown"]
 
@@ -349,68 +66,6 @@ if st.session_state["show_sidebar"]:
     with st.sidebar:
         section = st.radio("Navigate", ["Dashboard", "Crop-Specific Data"])
 
-def circle_coords(lon, lat, radius_km, n_points=100):
-    coords = []
-    for i in range(n_points):
-        angle = 2 * math.pi * i / n_points
-        dx = radius_km * math.cos(angle)
-        dy = radius_km * math.sin(angle)
-        dlon = dx / (111.32 * math.cos(math.radians(lat)))
-        dlat = dy / 111.32
-        coords.append((lon + dlon, lat + dlat))
-    return coords
-
-@st.cache_data
-def load_steel_plants():
-    try:
-        df = pd.read_excel("steel_plant_data.xlsx")
-
-        def to_decimal(coord):
-            try:
-                if isinstance(coord, str) and "°" in coord:
-                    parts = coord.replace("°", " ").replace("'", " ").replace('"', " ").split()
-                    deg, min_, sec, direction = int(parts[0]), int(parts[1]), float(parts[2]), parts[3]
-                    decimal = deg + min_/60 + sec/3600
-                    return -decimal if direction in ["S", "W"] else decimal
-                return float(coord)
-            except:
-                return None
-
-        df["latitude"] = df["Latitude"].apply(to_decimal)
-        df["longitude"] = df["Longitude"].apply(to_decimal)
-
-        df = df.dropna(subset=["latitude", "longitude"])
-        return df
-    except Exception as e:
-        st.error(f"Error loading steel plants data: {str(e)}")
-        return pd.DataFrame()
-
-@st.cache_data
-def load_geocoded_companies():
-    try:
-        df = pd.read_excel("geocoded_combined_companies.xlsx")
-        # Clean up any invalid coordinates
-        df = df.dropna(subset=["Latitude", "Longitude"])
-        df = df[(df["Latitude"].abs() <= 90) & (df["Longitude"].abs() <= 180)]
-        return df
-    except Exception as e:
-        st.error(f"Error loading geocoded companies data: {str(e)}")
-        return pd.DataFrame()
-
-def load_ricemill_data():
-    try:
-        df = pd.read_csv("ricemills.csv")
-        
-        # Clean up any invalid coordinates
-        if "lat" in df.columns and "lng" in df.columns:
-            df = df.dropna(subset=["lat", "lng"])
-            df = df[(df["lat"].abs() <= 90) & (df["lng"].abs() <= 180)]
-
-        return df
-    except Exception as e:
-        st.error(f"Error loading ricemill data: {str(e)}")
-        return pd.DataFrame()
-
 geojson_metadata = {
     "enhanced_lantanapresence.geojson": {
         "source": "Research Paper",
@@ -471,113 +126,42 @@ geojson_metadata = {
 }
 
 if section == "Dashboard":
+    import plotly.graph_objects as go
     st.title("Biochar Cluster Map with Industrial Data and GeoJSON Overlays")
     
 
     # Multi-select for data sources
     data_sources = st.multiselect(
         "Select Data Sources:",
-        ["Steel Plants", "Steel Plants with BF", "Geocoded Companies", "Rice Mills"],
+        list(DATASETS.keys()),
         default=["Steel Plants"],
         help="Choose one or more data sources to visualize together."
     )
 
-    # Load and tag all selected data sources
-    all_dfs = []
-    for source in data_sources:
-        if source == "Steel Plants":
-            df = load_steel_plants()
-            df["source_type"] = "Steel Plants"
-        elif source == "Steel Plants with BF":
-            from steel_plant_bf_loader import load_steel_plants_bf
-            df = load_steel_plants_bf()
-            df["source_type"] = "Steel Plants with BF"
-        elif source == "Geocoded Companies":
-            df = load_geocoded_companies()
-            df["source_type"] = "Geocoded Companies"
-        elif source == "Rice Mills":
-            df = load_ricemill_data()
-            df["source_type"] = "Rice Mills"
-        else:
-            continue
-        # Normalize columns for each df
-        if "State" in df.columns and "state" not in df.columns:
-            df["state"] = df["State"]
-        if "state" in df.columns and "State" not in df.columns:
-            df["State"] = df["state"]
-        if "District" in df.columns and "district" not in df.columns:
-            df["district"] = df["District"]
-        if "district" in df.columns and "District" not in df.columns:
-            df["District"] = df["district"]
-        # Special fix for Rice Mills: if no 'district' column, but 'District' exists, create 'district' from 'District'
-        if source == "Rice Mills":
-            # Always use detailed_district and detailed_state if present
-            if "detailed_district" in df.columns:
-                df["district"] = df["detailed_district"]
-            elif "District" in df.columns:
-                df["district"] = df["District"]
-            elif "address" in df.columns:
-                df["district"] = df["address"].apply(lambda x: x.split(",")[-2].strip() if isinstance(x, str) and "," in x else None)
-            if "detailed_state" in df.columns:
-                df["state"] = df["detailed_state"]
-            elif "State" in df.columns:
-                df["state"] = df["State"]
-        if "Plant Name" in df.columns and "Plant" not in df.columns:
-            df["Plant"] = df["Plant Name"]
-        if "Plant" in df.columns and "Plant Name" not in df.columns:
-            df["Plant Name"] = df["Plant"]
-        if "Latitude" in df.columns and "latitude" not in df.columns:
-            df["latitude"] = df["Latitude"]
-        if "latitude" in df.columns and "Latitude" not in df.columns:
-            df["Latitude"] = df["latitude"]
-        if "Longitude" in df.columns and "longitude" not in df.columns:
-            df["longitude"] = df["Longitude"]
-        if "longitude" in df.columns and "Longitude" not in df.columns:
-            df["Longitude"] = df["longitude"]
-        all_dfs.append(df)
-
-    if not all_dfs:
+    # Compact hot frame of every source, loaded once per process and shared by all sessions
+    try:
+        with timed("Load points", stage_times):
+            points = load_points()
+    except Exception as e:
+        st.error(f"Error loading point data: {str(e)}")
+        st.stop()
+
+    if not data_sources:
         st.warning("No data sources selected.")
         st.stop()
 
-    # Concatenate all selected data
-    plants = pd.concat(all_dfs, ignore_index=True)
+    # Filter results are memoized frames shared across sessions (read-only)
+    plants = filter_points(data_sources)
 
     with st.expander("Data Debug Info"):
         st.write(f"Loaded {len(plants)} records from {', '.join(data_sources)}")
         st.dataframe(plants)
-        invalid_coords = pd.DataFrame()
-        for source in data_sources:
-            if source in ["Steel Plants", "Steel Plants with BF"]:
-                # Ensure latitude/longitude are numeric
-                lat = pd.to_numeric(plants["latitude"], errors="coerce") if "latitude" in plants.columns else pd.Series(dtype=float)
-                lon = pd.to_numeric(plants["longitude"], errors="coerce") if "longitude" in plants.columns else pd.Series(dtype=float)
-                mask = (plants["source_type"] == source)
-                invalid_coords = pd.concat([
-                    invalid_coords,
-                    plants[mask & ((lat.abs() > 90) | (lon.abs() > 180))]
-                ])
-            elif source == "Rice Mills":
-                if "lat" in plants.columns and "lng" in plants.columns:
-                    lat = pd.to_numeric(plants["lat"], errors="coerce")
-                    lng = pd.to_numeric(plants["lng"], errors="coerce")
-                    mask = (plants["source_type"] == source)
-                    invalid_coords = pd.concat([
-                        invalid_coords,
-                        plants[mask & ((lat.abs() > 90) | (lng.abs() > 180))]
-                    ])
-            elif source == "Geocoded Companies":
-                # Ensure Latitude/Longitude are numeric
-                lat = pd.to_numeric(plants["Latitude"], errors="coerce") if "Latitude" in plants.columns else pd.Series(dtype=float)
-                lon = pd.to_numeric(plants["Longitude"], errors="coerce") if "Longitude" in plants.columns else pd.Series(dtype=float)
-                mask = (plants["source_type"] == source)
-                invalid_coords = pd.concat([
-                    invalid_coords,
-                    plants[mask & ((lat.abs() > 90) | (lon.abs() > 180))]
-                ])
+        invalid_coords = pd.concat([invalid_coordinates(source) for source in data_sources if source in DATASETS])
         if not invalid_coords.empty:
             st.warning(f"Found {len(invalid_coords)} records with invalid coordinates:")
             st.dataframe(invalid_coords)
+        st.write("Memory use per source (bytes):")
+        st.dataframe(memory_report())
 
     # --- FILTER WIDGETS ---
     st.markdown(f"#### 🔍 Filter Data (applies to all selected sources)")
@@ -585,91 +169,37 @@ if section == "Dashboard":
     state_filter = st.multiselect("State", options=plants["state"].dropna().unique())
     district_filter = st.multiselect("District", options=plants["district"].dropna().unique())
 
-    filtered_plants = plants.copy()
-    if name_filter:
-        # Try to filter by all possible name columns
-        name_cols = [col for col in ["Plant Name", "Plant", "name", "Company_Name"] if col in filtered_plants.columns]
-        mask = pd.Series([False]*len(filtered_plants))
-        for col in name_cols:
-            mask = mask | filtered_plants[col].astype(str).str.contains(name_filter, case=False, na=False)
-        filtered_plants = filtered_plants[mask]
-    if state_filter:
-        filtered_plants = filtered_plants[filtered_plants["state"].isin(state_filter)]
-    if district_filter:
-        filtered_plants = filtered_plants[filtered_plants["district"].isin(district_filter)]
+    with timed("Filter", stage_times):
+        # Name matches come ranked from the trigram name index
+        filtered_plants = filter_points(data_sources, name_filter, state_filter, district_filter)
 
     # --- DISPLAY SEARCH RESULTS ---
     if name_filter and not filtered_plants.empty:
         st.markdown("---")
-        st.markdown(f"#### ℹ️ Details for Found Results")
-        for source in data_sources:
-            df = filtered_plants[filtered_plants['source_type'] == source]
-            if df.empty:
-                continue
-            for index, row in df.iterrows():
-                if source == "Steel Plants":
-                    with st.expander(f"{row['Plant Name']}"):
-                        st.write(f"**Capacity (MTPA):** {row.get('Capacity(MTPA)', 'N/A')}")
-                        st.write(f"**Furnace Type:** {row.get('Furnance', 'N/A')}")
-                        st.write(f"**Operational Status:** {row.get('Operational', 'N/A')}")
-                        source_url = row.get('Source')
-                        if isinstance(source_url, str) and source_url.startswith('http'):
-                            st.markdown(f"**Source:** <a href='{source_url}' target='_blank'>Visit Link</a>", unsafe_allow_html=True)
-                        else:
-                            st.write(f"**Source:** {source_url if pd.notna(source_url) else 'N/A'}")
-                elif source == "Steel Plants with BF":
-                    plant_name = row.get('Plant') if 'Plant' in row else row.get('Plant Name', 'Unknown Plant')
-                    with st.expander(f"{plant_name}"):
-                        st.write(f"**Blast Furnace Capacity:** {row.get('Quantity', 'N/A')} Mtpa")
-                        st.write(f"**State:** {row.get('State', 'N/A')}")
-                        st.write(f"**District:** {row.get('District', 'N/A')}")
-                elif source == "Rice Mills":
-                    with st.expander(f"{row['name']}"):
-                        st.write(f"**Address:** {row.get('address', 'N/A')}")
-                        st.write(f"**Phone:** {row.get('phone', 'N/A')}")
-                        st.write(f"**Email:** {row.get('email', 'N/A')}")
-                        st.write(f"**State:** {row.get('state', 'N/A')}")
-                        st.write(f"**Country:** {row.get('country', 'N/A')}")
-                        st.write(f"**ZIP:** {row.get('zip', 'N/A')}")
-                        st.write(f"**Rating:** {row.get('star_count', 'N/A')} ({row.get('rating_count', 'N/A')} reviews)")
-                        st.write(f"**Category:** {row.get('primary_category_name', 'N/A')}")
-                        website_url = row.get('url')
-                        if isinstance(website_url, str) and website_url.startswith('http'):
-                            st.markdown(f"**Website:** <a href='{website_url}' target='_blank'>Visit Site</a>", unsafe_allow_html=True)
-                        else:
-                            st.write(f"**Website:** {website_url if pd.notna(website_url) else 'N/A'}")
-                        social_links = []
-                        if pd.notna(row.get('facebook_link')) and row.get('facebook_link').startswith('http'):
-                            social_links.append(f"<a href='{row['facebook_link']}' target='_blank'>Facebook</a>")
-                        if pd.notna(row.get('instagram_link')) and row.get('instagram_link').startswith('http'):
-                            social_links.append(f"<a href='{row['instagram_link']}' target='_blank'>Instagram</a>")
-                        if pd.notna(row.get('twitter_link')) and row.get('twitter_link').startswith('http'):
-                            social_links.append(f"<a href='{row['twitter_link']}' target='_blank'>Twitter</a>")
-                        if pd.notna(row.get('linkedin_link')) and row.get('linkedin_link').startswith('http'):
-                            social_links.append(f"<a href='{row['linkedin_link']}' target='_blank'>LinkedIn</a>")
-                        if pd.notna(row.get('youtube_link')) and row.get('youtube_link').startswith('http'):
-                            social_links.append(f"<a href='{row['youtube_link']}' target='_blank'>YouTube</a>")
-                        if pd.notna(row.get('whatsapp_link')) and row.get('whatsapp_link').startswith('http'):
-                            social_links.append(f"<a href='{row['whatsapp_link']}' target='_blank'>WhatsApp</a>")
-                        if pd.notna(row.get('tiktok_link')) and row.get('tiktok_link').startswith('http'):
-                            social_links.append(f"<a href='{row['tiktok_link']}' target='_blank'>TikTok</a>")
-                        if social_links:
-                            st.markdown(f"**Social Media:** {' | '.join(social_links)}", unsafe_allow_html=True)
-                elif source == "Geocoded Companies":
-                    with st.expander(f"{row['Company_Name']}"):
-                        st.write(f"**Sales Revenue:** {row.get('Sales_Revenue', 'N/A')}")
-                        st.write(f"**City:** {row.get('City', 'N/A')}")
-                        st.write(f"**State:** {row.get('State', 'N/A')}")
-                        st.write(f"**Country:** {row.get('Country', 'N/A')}")
-                        company_url = row.get('Company_URL')
-                        if isinstance(company_url, str) and company_url.startswith('http'):
-                            st.markdown(f"**Website:** <a href='{company_url}' target='_blank'>Visit Site</a>", unsafe_allow_html=True)
-                        else:
-                            st.write(f"**Website:** {company_url if pd.notna(company_url) else 'N/A'}")
+        st.markdown(f"#### ℹ️ Details for Found Results ({len(filtered_plants)} matches)")
+        col1, col2 = st.columns([1, 1])
+        with col1:
+            page_size = st.selectbox("Results per page", [10, 25, 50, 100], index=1)
+        page_count = max(1, -(-len(filtered_plants) // page_size))
+        with col2:
+            page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+        # Cards only for the visible page, from the precomputed per-row payloads (best matches first)
+        page_rows = filtered_plants.iloc[(page - 1) * page_size:page * page_size]
+        st.caption(f"Showing results {(page - 1) * page_size + 1}–{(page - 1) * page_size + len(page_rows)} of {len(filtered_plants)}")
+        payloads = {}
+        for source, rows in page_rows.groupby("source_type", observed=True, sort=False):
+            payloads.update(zip(rows.index, card_payloads(source, rows["row_id"].to_numpy())))
+        for index, name, source in zip(page_rows.index, page_rows["name"], page_rows["source_type"]):
+            with st.expander(f"{name} · {source}"):
+                st.markdown(payloads[index], unsafe_allow_html=True)
         st.markdown("---")
 
     geojson_file1 = st.selectbox("Select Primary GeoJSON Overlay:", ["None"] + list(geojson_metadata.keys()), key="geo1")
     geojson_file2 = st.selectbox("Select Comparison GeoJSON Overlay (optional):", ["None"] + list(geojson_metadata.keys()), key="geo2")
+    # Streamlit does not report the map's own zoom back, so zoom is a control that also picks the overlay detail level
+    map_zoom = st.select_slider("Map zoom (finer overlay outlines when zoomed in)", options=list(range(3, 13)), value=4)
+    overlay_level = level_for_zoom(map_zoom)
+    catchment_radius = st.select_slider("Catchment radius around steel plants (km)", options=CATCHMENT_RADII_KM, value=50)
 
     def show_metadata_and_image(geojson_file):
         meta = geojson_metadata.get(geojson_file, {})
@@ -718,67 +248,78 @@ if section == "Dashboard":
                 filter_info = f" in {len(state_filter)} states"
         if not filter_info:
             filter_info = " matching your criteria"
-        st.info(f"Showing {len(filtered_plants)} records from {', '.join(data_sources)}{filter_info}.")
+        # Summaries come from the precomputed aggregation cube; a name search (or a cube not built for the
+        # current data yet) needs the matching rows instead
+        with timed("Summaries", stage_times):
+            summary_cube = None if name_filter else cube_slice("points", data_sources, state_filter, district_filter)
+            record_count = len(filtered_plants) if summary_cube is None else int(summary_cube["records"].sum())
+        st.info(f"Showing {record_count} records from {', '.join(data_sources)}{filter_info}.")
 
         # Show total capacity for Steel Plants with BF if present
-        if "Steel Plants with BF" in data_sources and "Quantity" in filtered_plants.columns:
-            total_capacity = filtered_plants[filtered_plants["source_type"] == "Steel Plants with BF"]["Quantity"].sum()
+        if "Steel Plants with BF" in data_sources:
+            if summary_cube is None:
+                bf_rows = filtered_plants.loc[filtered_plants["source_type"] == "Steel Plants with BF", "row_id"].to_numpy()
+                total_capacity = load_details("Steel Plants with BF", bf_rows)["Quantity"].sum()
+            else:
+                total_capacity = summary_cube["bf_capacity_mtpa"].sum()
             st.markdown(f"<div style='background-color: #e6f3ff; padding: 10px; border-radius: 5px; margin-bottom: 10px;'><b>Total Blast Furnace Capacity (Steel Plants with BF):</b> {total_capacity:.2f} Mtpa</div>", unsafe_allow_html=True)
 
+        with st.expander("📊 Summary by state"):
+            if summary_cube is None:
+                by_state = filtered_plants.groupby(["state", "source_type"], observed=True).size().unstack(fill_value=0)
+            else:
+                by_state = summary_cube.pivot_table(index="state", columns="source", values="records", aggfunc="sum", fill_value=0)
+            st.bar_chart(by_state)
+            summary_overlays = [f for f in [geojson_file1, geojson_file2] if f != "None"]
+            if summary_overlays:
+                overlay_summary = cube_slice("overlay", summary_overlays, state_filter, district_filter)
+                if overlay_summary is None:
+                    st.caption("Overlay areas by state appear once the aggregation cube is built (python aggregation_cube.py).")
+                else:
+                    st.dataframe(overlay_summary.groupby(["source", "state"])[["overlay_features", "overlay_area_km2"]].sum().round(1).rename(
+                        columns={"overlay_features": "Features (per district)", "overlay_area_km2": "Area (km²)"}))
+
         # Plot all selected sources together, color by source_type
-        color_map = {
-            "Steel Plants": "purple",
-            "Steel Plants with BF": "red",
-            "Geocoded Companies": "green",
-            "Rice Mills": "orange"
-        }
-        import plotly.graph_objects as go
+        figure_start = time.perf_counter()
         fig = go.Figure()
         for source in data_sources:
             df = filtered_plants[filtered_plants["source_type"] == source]
             if df.empty:
                 continue
-            if source in ["Steel Plants", "Steel Plants with BF"]:
-                lat_col, lon_col = "latitude", "longitude"
-                hover_name_col = "Plant Name" if "Plant Name" in df.columns else "Plant"
-            elif source == "Rice Mills":
-                lat_col, lon_col = "lat", "lng"
-                hover_name_col = "name"
-            else:  # Geocoded Companies
-                lat_col, lon_col = "Latitude", "Longitude"
-                hover_name_col = "Company_Name"
-            if lat_col not in df.columns or lon_col not in df.columns:
-                continue
-            # Ensure lat/lon columns are float for Arrow compatibility
-            df = df.copy()
-            df[lat_col] = pd.to_numeric(df[lat_col], errors="coerce")
-            df[lon_col] = pd.to_numeric(df[lon_col], errors="coerce")
-            # Build hover text for each row
-            hover_texts = []
-            for idx, row in df.iterrows():
-                name = row[hover_name_col] if hover_name_col in row and pd.notna(row[hover_name_col]) else "Unknown"
-                state = row["state"] if "state" in row and pd.notna(row["state"]) else row["State"] if "State" in row and pd.notna(row["State"]) else "Unknown"
-                district = row["district"] if "district" in row and pd.notna(row["district"]) else row["District"] if "District" in row and pd.notna(row["District"]) else "Unknown"
-                if source == "Steel Plants with BF":
-                    capacity = row["Quantity"] if "Quantity" in row and pd.notna(row["Quantity"]) else "N/A"
-                    hover_text = f"<b>{name}</b><br>Capacity: {capacity} Mtpa<br>District: {district}<br>State: {state}"
-                else:
-                    hover_text = f"<b>{name}</b><br>District: {district}<br>State: {state}"
-                hover_texts.append(hover_text)
+            color = DATASETS[source].get("color", "gray")
+            if DATASETS[source].get("cluster"):
+                # Dense layers: one marker per occupied grid cell at this zoom, plus the sites alone in theirs
+                df, clusters = cluster_points(df, source, map_zoom)
+                if not clusters.empty:
+                    fig.add_trace(go.Scattermapbox(
+                        lat=clusters["latitude"],
+                        lon=clusters["longitude"],
+                        mode="markers+text",
+                        marker=dict(size=np.clip(8 + 4 * np.sqrt(clusters["count"].to_numpy()), 10, 40), color=color, opacity=0.7),
+                        text=clusters["count"].astype(str),
+                        textfont=dict(size=10, color="black"),
+                        name=f"{source} (clusters)",
+                        customdata=clusters["count"],
+                        hovertemplate=f"<b>%{{customdata}} {source}</b><br>Zoom in to expand<extra></extra>"
+                    ))
+                if df.empty:
+                    continue
+            customdata, hovertemplate = hover_data(df, source)
             fig.add_trace(go.Scattermapbox(
-                lat=df[lat_col],
-                lon=df[lon_col],
+                lat=df["latitude"],
+                lon=df["longitude"],
                 mode="markers",
-                marker=dict(size=8, color=color_map.get(source, "gray")),
+                marker=dict(size=8, color=color),
                 name=source,
-                text=hover_texts,
-                hoverinfo="text"
+                customdata=customdata,
+                hovertemplate=hovertemplate
             ))
 
         fig.update_layout(
             mapbox_style="carto-positron",
             mapbox_center={"lat": 20.5937, "lon": 78.9629},
-            mapbox_zoom=4,
+            mapbox_zoom=map_zoom,
+            uirevision=map_zoom,
             height=500,
             margin={"r":0,"t":0,"l":0,"b":0}
         )
@@ -788,99 +329,89 @@ if section == "Dashboard":
             geojson_file2: "rgba(0, 128, 255, 0.5)"
         }
 
-        # Add polygons/overlays as before
+        # Add each overlay as a few batched traces from the pre-decoded binary store
         for geojson_file in [geojson_file1, geojson_file2]:
             if geojson_file != "None" and os.path.exists(geojson_file):
-                with open(geojson_file) as f:
-                    geojson_data = json.load(f)
-                overlay_color = overlay_colors.get(geojson_file, "rgba(0,0,0,0.5)")
-                fill_color = overlay_color.replace("0.5", "0.2")
-                line_color = overlay_color.replace("0.5", "0.8")
-                for feature in geojson_data["features"]:
-                    geom_type = feature["geometry"]["type"]
-                    coords = feature["geometry"]["coordinates"]
-                    if not coords or (isinstance(coords, list) and len(coords) == 0):
-                        continue
+                try:
+                    overlay = load_overlay(geojson_file)
+                    overlay_color = overlay_colors.get(geojson_file, "rgba(0,0,0,0.5)")
+                    fig.add_traces(overlay_traces(overlay, geojson_file, overlay_color, level=overlay_level))
+                except Exception as e:
+                    st.warning(f"⚠️ Skipped overlay {geojson_file}: {e}")
+
+        # Catchment of every shown steel plant against each selected overlay
+        selected_overlays = [f for f in [geojson_file1, geojson_file2] if f != "None" and os.path.exists(f)]
+        shown_plants = filtered_plants[filtered_plants["source_type"].isin(PLANT_SOURCES)]
+        catchments = {}
+        if selected_overlays and not shown_plants.empty:
+            with timed("Catchments", stage_times):
+                for geojson_file in selected_overlays:
                     try:
-                        if geom_type == "Polygon":
-                            polygon_coords = coords[0]
-                            if not polygon_coords:
-                                continue
-                            lons, lats = zip(*polygon_coords)
-                            tooltip_text = f"<b>Polygon Information</b><br>"
-                            feature_props = feature.get("properties", {})
-                            districts = feature_props.get("districts", [])
-                            states = feature_props.get("states", [])
-                            if districts:
-                                tooltip_text += f"Districts: {', '.join(districts)}<br>"
-                            if states:
-                                tooltip_text += f"States: {', '.join(states)}"
-                            if not districts and not states:
-                                tooltip_text = "Polygon area (location data unavailable)"
-                            fig.add_trace(go.Scattermapbox(
-                                lat=list(lats),
-                                lon=list(lons),
-                                fill="toself",
-                                fillcolor=fill_color,
-                                line=dict(color=line_color, width=2),
-                                mode="lines",
-                                name=f"Polygon ({geojson_file})",
-                                hovertext=tooltip_text,
-                                hoverinfo="text",
-                                showlegend=False
-                            ))
-                        elif geom_type == "Point":
-                            lon, lat = coords
-                            feature_props = feature.get("properties", {})
-                            districts = feature_props.get("districts", [])
-                            states = feature_props.get("states", [])
-                            tooltip_text = ""
-                            if districts:
-                                tooltip_text += f"Districts: {', '.join(districts)}<br>"
-                            if states:
-                                tooltip_text += f"States: {', '.join(states)}"
-                            if not tooltip_text:
-                                tooltip_text = "Location data unavailable"
-                            fig.add_trace(go.Scattermapbox(
-                                lat=[lat],
-                                lon=[lon],
-                                mode="markers",
-                                marker=dict(size=8, color=overlay_color),
-                                name="GeoJSON Point",
-                                hovertext=tooltip_text,
-                                hoverinfo="text"
-                            ))
-                        elif geom_type == "MultiPolygon":
-                            for i, poly_coords in enumerate(coords):
-                                if not poly_coords or not poly_coords[0]:
-                                    continue
-                                lons, lats = zip(*poly_coords[0])
-                                feature_props = feature.get("properties", {})
-                                districts = feature_props.get("districts", [])
-                                states = feature_props.get("states", [])
-                                tooltip_text = f"<b>MultiPolygon Part {i+1}</b><br>"
-                                if districts:
-                                    tooltip_text += f"Districts: {', '.join(districts)}<br>"
-                                if states:
-                                    tooltip_text += f"States: {', '.join(states)}"
-                                if not districts and not states:
-                                    tooltip_text += "Location data unavailable"
-                                fig.add_trace(go.Scattermapbox(
-                                    lat=list(lats),
-                                    lon=list(lons),
-                                    fill="toself",
-                                    fillcolor=fill_color,
-                                    line=dict(color=line_color, width=2),
-                                    mode="lines",
-                                    name=f"MultiPolygon ({geojson_file})",
-                                    hovertext=tooltip_text,
-                                    hoverinfo="text",
-                                    showlegend=False
-                                ))
+                        catchments[geojson_file] = catchment_table(geojson_file, catchment_radius).loc[shown_plants.index]
                     except Exception as e:
-                        st.warning(f"⚠️ Skipped polygon: {e}")
+                        st.warning(f"⚠️ Could not compute catchments for {geojson_file}: {e}")
+            reached = shown_plants.index[np.any([c["features"].to_numpy() > 0 for c in catchments.values()], axis=0)] \
+                if catchments else shown_plants.index[:0]
+            if len(reached):
+                centers = shown_plants.loc[reached]
+                ring_lon, ring_lat = packed_geodesic_rings(centers["longitude"], centers["latitude"], [catchment_radius])
+                fig.add_trace(go.Scattermapbox(
+                    lat=ring_lat,
+                    lon=ring_lon,
+                    mode="lines",
+                    line=dict(color="rgba(128, 0, 128, 0.6)", width=1),
+                    name=f"{catchment_radius} km catchments",
+                    hoverinfo="skip"
+                ))
+        stage_times["Build map figure"] = time.perf_counter() - figure_start
         # Display the map
-        st.plotly_chart(fig, use_container_width=True, config={"scrollZoom": True})
+        with timed("Send map to browser", stage_times):
+            st.plotly_chart(fig, use_container_width=True, config={"scrollZoom": True})
+
+        for geojson_file, table in catchments.items():
+            st.markdown(f"#### 🏭 Steel plant catchments ({catchment_radius} km) in {geojson_file}")
+            st.dataframe(table.sort_values("area_km2", ascending=False).rename(columns={
+                "source_type": "Source", "name": "Plant", "state": "State", "district": "District",
+                "features": "Overlay features", "area_km2": "Overlay area (km²)",
+                "catchment_districts": "Catchment districts",
+            }), hide_index=True)
+            with st.expander("District breakdown"):
+                breakdown = catchment_districts(geojson_file, catchment_radius)
+                breakdown = breakdown[breakdown["plant"].isin(table.index)]
+                breakdown = breakdown.assign(plant=shown_plants.loc[breakdown["plant"], "name"].to_numpy())
+                st.dataframe(breakdown.sort_values(["plant", "area_km2"], ascending=[True, False]).round(2), hide_index=True)
+
+        # Nearest rice mills to one plant, from the KD-tree supplier index
+        if not shown_plants.empty:
+            st.markdown("#### 🌾 Nearest rice mill suppliers")
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                supplier_plant = st.selectbox(
+                    "Steel plant", shown_plants.index,
+                    format_func=lambda i: f"{shown_plants.at[i, 'name']} ({shown_plants.at[i, 'district']}, {shown_plants.at[i, 'state']})")
+            with col2:
+                supplier_count = st.number_input("Top N", min_value=1, max_value=100, value=10)
+            with timed("Nearest suppliers", stage_times):
+                suppliers = top_suppliers(supplier_plant, int(supplier_count), SUPPLIER_SOURCES)
+            st.dataframe(suppliers.rename(columns={
+                "source_type": "Source", "name": "Supplier", "state": "State", "district": "District",
+                "distance_km": "Distance (km)",
+            }), hide_index=True)
+
+        # Sites inside / near each selected overlay, from the per-layer spatial index
+        if selected_overlays:
+            near_km = st.slider("Distance for \"near overlay\" counts (km)", 1, 100, 10)
+            with timed("Overlay joins", stage_times):
+                for geojson_file in selected_overlays:
+                    try:
+                        flags = site_overlay_flags(geojson_file, near_km).loc[filtered_plants.index]
+                    except Exception as e:
+                        st.warning(f"⚠️ Could not join sites with {geojson_file}: {e}")
+                        continue
+                    counts = flags.groupby(filtered_plants["source_type"], observed=True).sum()
+                    counts.columns = ["Inside overlay", f"Within {near_km} km"]
+                    st.markdown(f"#### 📍 Sites vs {geojson_file}")
+                    st.dataframe(counts)
         
         # # Display legend below the map
         # st.markdown("""
@@ -897,7 +428,13 @@ if section == "Dashboard":
     else:
         st.info("Map visualization not available - coordinate data missing.")
 
+    with st.expander("⏱️ Timing (this rerun)"):
+        st.dataframe(pd.DataFrame(
+            {"stage": list(stage_times.keys()), "seconds": [round(v, 4) for v in stage_times.values()]}
+        ))
+
 elif section == "Crop-Specific Data":
+    from streamlit_pdf_viewer import pdf_viewer
     st.title("🌾 Crop-Specific Biochar Resource Information")
     crop_selected = st.selectbox("Choose a Crop", ["Cotton", "Sugarcane", "Maize", "Juliflora", "Lantana","Bamboo"])
 
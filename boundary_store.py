@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Precompiled store of the India state and district boundaries.
+india_states.geojson / india_districts.geojson are read, normalized (the
+NAME_1 / ST_NM / ... column fallbacks), repaired and written once under
+.boundary_store/, so the reverse geocoder, the preprocessing and the app load
+ready-made arrays instead of re-reading and re-normalizing the GeoJSON files.
+
+Layout (rows are all states, then all districts):
+    geometries.wkb       concatenated WKB of every boundary
+    wkb_offsets.npy      int64, row i -> geometries.wkb[wkb_offsets[i]:wkb_offsets[i+1]]
+    bounds.npy           float64 (n, 4) minx, miny, maxx, maxy
+    attributes.parquet   name, boundary_type ("state" / "district"), state_name
+    <type>_cells.npy     int64 CSR offsets of the grid index (n_cells + 1) per boundary type
+    <type>_items.npy     int32 row (within the type) of every boundary whose box overlaps a cell
+    meta.json            source versions, row counts and the grid (origin, cell size, shape)
+
+The grid index buckets each boundary's bounding box into GRID_CELL_DEGREES
+cells, so a point lookup is a cell lookup plus an exact test against the few
+boundaries listed there; it is stored with the geometries and never rebuilt
+at load time.
+
+Compile ahead of time with: python boundary_store.py
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import shapely
+
+STORE_DIR = ".boundary_store"
+FORMAT_VERSION = 1
+STATES_FILE = "india_states.geojson"
+DISTRICTS_FILE = "india_districts.geojson"
+BOUNDARY_FILES = [STATES_FILE, DISTRICTS_FILE]
+BOUNDARY_TYPES = ["state", "district"]
+GRID_CELL_DEGREES = 0.25
+# Source columns holding the canonical name, first present wins
+NAME_COLUMNS = {"state": ["NAME_1", "ST_NM", "state"], "district": ["NAME_2", "DISTRICT", "district"]}
+STATE_NAME_COLUMNS = ["NAME_1", "ST_NM"]
+# Serializes compiles between the app's session threads
+_compile_lock = threading.Lock()
+
+
+def boundary_version():
+    """Size/mtime of the boundary files, recorded with everything derived from them"""
+    return [[os.path.getsize(path), os.stat(path).st_mtime_ns] for path in BOUNDARY_FILES if os.path.exists(path)]
+
+
+def store_version():
+    """Hashable version key of the store (the boundary files' versions)"""
+    return tuple(tuple(version) for version in boundary_version())
+
+
+def _first_column(df, columns):
+    present = [col for col in columns if col in df.columns]
+    return df[present[0]] if present else pd.Series(None, index=df.index, dtype=object)
+
+
+def read_boundary_files():
+    """Read and normalize both boundary files into one frame of name, boundary_type, state_name, geometry"""
+    import geopandas as gpd
+
+    frames = []
+    for boundary_type, path in zip(BOUNDARY_TYPES, BOUNDARY_FILES):
+        gdf = gpd.read_file(path)
+        if gdf.crs is not None and gdf.crs != "EPSG:4326":
+            gdf = gdf.to_crs("EPSG:4326")
+        frames.append(pd.DataFrame({
+            "name": _first_column(gdf, NAME_COLUMNS[boundary_type]).to_numpy(dtype=object),
+            "boundary_type": boundary_type,
+            "state_name": (_first_column(gdf, STATE_NAME_COLUMNS) if boundary_type == "district"
+                           else pd.Series(None, index=gdf.index, dtype=object)).to_numpy(dtype=object),
+            "geometry": gdf.geometry.to_numpy(dtype=object),
+        }))
+    boundaries = pd.concat(frames, ignore_index=True)
+    return boundaries[boundaries["geometry"].notna()].reset_index(drop=True)
+
+
+def _grid(bounds):
+    """Grid covering all bounding boxes: origin, cell size and shape"""
+    extent = bounds[:, :2].min(axis=0), bounds[:, 2:].max(axis=0)
+    shape = np.maximum(np.ceil((extent[1] - extent[0]) / GRID_CELL_DEGREES), 1).astype(int)
+    return {"x0": float(extent[0][0]), "y0": float(extent[0][1]), "cell": GRID_CELL_DEGREES,
+            "nx": int(shape[0]), "ny": int(shape[1])}
+
+
+def _cell_range(grid, x, y):
+    """Clipped grid column/row of coordinates"""
+    ix = np.clip(np.floor((x - grid["x0"]) / grid["cell"]).astype("int64"), 0, grid["nx"] - 1)
+    iy = np.clip(np.floor((y - grid["y0"]) / grid["cell"]).astype("int64"), 0, grid["ny"] - 1)
+    return ix, iy
+
+
+def _grid_index(grid, bounds):
+    """CSR (cell offsets, row items) of the cells each bounding box overlaps"""
+    ix0, iy0 = _cell_range(grid, bounds[:, 0], bounds[:, 1])
+    ix1, iy1 = _cell_range(grid, bounds[:, 2], bounds[:, 3])
+    width, height = ix1 - ix0 + 1, iy1 - iy0 + 1
+    counts = width * height
+    row = np.repeat(np.arange(len(bounds)), counts)
+    within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    cell = (np.repeat(iy0, counts) + within // np.repeat(width, counts)) * grid["nx"] \
+        + np.repeat(ix0, counts) + within % np.repeat(width, counts)
+    order = np.argsort(cell, kind="stable")
+    offsets = np.zeros(grid["nx"] * grid["ny"] + 1, dtype="int64")
+    offsets[1:] = np.cumsum(np.bincount(cell, minlength=grid["nx"] * grid["ny"]))
+    return offsets, row[order].astype("int32")
+
+
+def compile_boundary_store(replace=False):
+    """
+    Read the boundary files once and write the store; returns the store path.
+    A store that another compile made current meanwhile is kept unless replace.
+    """
+    boundaries = read_boundary_files()
+    geometries = boundaries["geometry"].to_numpy(dtype=object, copy=True)
+    invalid = ~shapely.is_valid(geometries)
+    geometries[invalid] = shapely.make_valid(geometries[invalid])
+    bounds = shapely.bounds(geometries)
+    wkb = shapely.to_wkb(geometries)
+    grid = _grid(bounds)
+
+    # Private build directory next to the store, so concurrent compiles never share files
+    tmp_path = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(STORE_DIR)), prefix=f"{STORE_DIR}.tmp")
+    try:
+        _write_store(tmp_path, boundaries, invalid, bounds, wkb, grid)
+        # Publish unless another compile already has; a current store is not removed under its readers
+        if replace or not _is_fresh():
+            shutil.rmtree(STORE_DIR, ignore_errors=True)
+            try:
+                os.rename(tmp_path, STORE_DIR)
+            except OSError:
+                if replace or not _is_fresh():
+                    raise
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    return STORE_DIR
+
+
+def _write_store(tmp_path, boundaries, invalid, bounds, wkb, grid):
+    with open(os.path.join(tmp_path, "geometries.wkb"), "wb") as f:
+        f.write(b"".join(wkb))
+    np.save(os.path.join(tmp_path, "wkb_offsets.npy"), np.concatenate([[0], np.cumsum([len(b) for b in wkb])]))
+    np.save(os.path.join(tmp_path, "bounds.npy"), bounds)
+    boundaries[["name", "boundary_type", "state_name"]].to_parquet(os.path.join(tmp_path, "attributes.parquet"),
+                                                                   index=False)
+    counts = {}
+    for boundary_type in BOUNDARY_TYPES:
+        rows = np.flatnonzero(boundaries["boundary_type"].to_numpy() == boundary_type)
+        offsets, items = _grid_index(grid, bounds[rows].reshape(-1, 4))
+        np.save(os.path.join(tmp_path, f"{boundary_type}_cells.npy"), offsets)
+        np.save(os.path.join(tmp_path, f"{boundary_type}_items.npy"), items)
+        counts[boundary_type] = len(rows)
+    with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+        json.dump({
+            "format": FORMAT_VERSION,
+            "sources": boundary_version(),
+            "counts": counts,
+            "repaired": int(invalid.sum()),
+            "grid": grid,
+        }, f, indent=2)
+
+
+def _read_meta():
+    try:
+        with open(os.path.join(STORE_DIR, "meta.json"), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _is_fresh():
+    meta = _read_meta()
+    return meta.get("format") == FORMAT_VERSION and meta.get("sources") == boundary_version()
+
+
+def boundaries_available():
+    """True when both boundary files exist (the store can be loaded or compiled)"""
+    return all(os.path.exists(path) for path in BOUNDARY_FILES)
+
+
+@lru_cache(maxsize=2)
+def _load_boundary_store(version):
+    meta = _read_meta()
+    offsets = np.load(os.path.join(STORE_DIR, "wkb_offsets.npy"))
+    with open(os.path.join(STORE_DIR, "geometries.wkb"), "rb") as f:
+        buffer = f.read()
+    wkb = np.array([buffer[start:end] for start, end in zip(offsets[:-1], offsets[1:])], dtype=object)
+    geometries = shapely.from_wkb(wkb) if len(wkb) else np.empty(0, dtype=object)
+    attributes = pd.read_parquet(os.path.join(STORE_DIR, "attributes.parquet"))
+    boundary_type = attributes["boundary_type"].to_numpy()
+    store = {"geometries": geometries, "bounds": np.load(os.path.join(STORE_DIR, "bounds.npy")),
+             "attributes": attributes, "grid": meta["grid"]}
+    for name in BOUNDARY_TYPES:
+        store[name] = {
+            "rows": np.flatnonzero(boundary_type == name),
+            "cells": np.load(os.path.join(STORE_DIR, f"{name}_cells.npy"), mmap_mode="r"),
+            "items": np.load(os.path.join(STORE_DIR, f"{name}_items.npy"), mmap_mode="r"),
+        }
+    return store
+
+
+def load_boundary_store():
+    """
+    The compiled boundaries, compiling them first if the store is missing or
+    older than the GeoJSON files. Returns a dict with geometries (shapely
+    array), bounds, attributes (DataFrame), grid, and per boundary type its
+    rows and grid CSR arrays (cells, items). Shared; do not mutate.
+    """
+    if not _is_fresh():
+        with _compile_lock:
+            # Sessions that waited for the lock reuse the store the first one compiled
+            if not _is_fresh():
+                compile_boundary_store()
+    return _load_boundary_store(store_version())
+
+
+def boundary_frame():
+    """The compiled boundaries as a GeoDataFrame (name, boundary_type, state_name, geometry)"""
+    import geopandas as gpd
+
+    store = load_boundary_store()
+    return gpd.GeoDataFrame(store["attributes"].copy(), geometry=store["geometries"], crs="EPSG:4326")
+
+
+def grid_query(store, boundary_type, lon, lat):
+    """
+    Candidate (point index, row within boundary_type) pairs whose grid cell
+    and bounding box contain each point; exact tests are left to the caller.
+    """
+    grid, index = store["grid"], store[boundary_type]
+    lon = np.asarray(lon, dtype="float64")
+    lat = np.asarray(lat, dtype="float64")
+    ix, iy = _cell_range(grid, lon, lat)
+    inside = ((lon >= grid["x0"]) & (lat >= grid["y0"])
+              & (lon <= grid["x0"] + grid["nx"] * grid["cell"]) & (lat <= grid["y0"] + grid["ny"] * grid["cell"]))
+    cell = np.where(inside, iy * grid["nx"] + ix, 0)
+    cells = np.asarray(index["cells"])
+    counts = np.where(inside, cells[cell + 1] - cells[cell], 0)
+    point_idx = np.repeat(np.arange(len(lon)), counts)
+    within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    rows = np.asarray(index["items"])[np.repeat(cells[cell], counts) + within].astype("int64")
+
+    bounds = store["bounds"][index["rows"][rows]]
+    x, y = lon[point_idx], lat[point_idx]
+    in_box = (x >= bounds[:, 0]) & (x <= bounds[:, 2]) & (y >= bounds[:, 1]) & (y <= bounds[:, 3])
+    return point_idx[in_box], rows[in_box]
+
+
+if __name__ == "__main__":
+    if not boundaries_available():
+        print(f"❌ Boundary files not found. Please ensure {STATES_FILE} and {DISTRICTS_FILE} exist.")
+    else:
+        path = compile_boundary_store(replace=True)
+        meta = _read_meta()
+        print(f"✅ {path}: {meta['counts']['state']} states, {meta['counts']['district']} districts, "
+              f"{meta['repaired']} repaired, grid {meta['grid']['nx']}x{meta['grid']['ny']}")
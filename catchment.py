@@ -0,0 +1,132 @@
+"""
+Biomass catchments around steel plants.
+For every plant in the steel plant sources and a catchment radius, finds the
+overlay features reaching into the circle, the overlay area inside it and the
+districts those features cover (from the layer's "districts" property).
+Candidate features come from the layer's STRtree; the clipping is done for
+all (plant, part) pairs at once in a local km frame around each plant.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from dataset_registry import load_points, points_version
+from geodesy import to_local_km
+from overlay_index import overlay_index, parts_near_points
+from overlay_store import overlay_version
+from overlay_traces import property_list
+
+PLANT_SOURCES = ["Steel Plants", "Steel Plants with BF"]
+CATCHMENT_RADII_KM = [10, 25, 50, 100]
+# Segments per quarter circle of the clipping disk
+DISK_QUAD_SEGMENTS = 16
+
+
+def _plants():
+    points = load_points()
+    return points[points["source_type"].isin(PLANT_SOURCES)]
+
+
+@lru_cache(maxsize=32)
+def _catchment_pairs(geojson_file, version, sites_version, radius_km):
+    plants = _plants()
+    index = overlay_index(geojson_file)
+    lon = plants["longitude"].to_numpy(dtype="float64")
+    lat = plants["latitude"].to_numpy(dtype="float64")
+    plant_idx, part_idx, _ = parts_near_points(index, lon, lat, radius_km)
+
+    disk = shapely.buffer(shapely.points(0.0, 0.0), radius_km, quad_segs=DISK_QUAD_SEGMENTS)
+    local = to_local_km(index["geometries"][part_idx], lon[plant_idx], lat[plant_idx])
+    # Rescaling can collapse nearly-touching vertices into self-intersections
+    invalid = ~shapely.is_valid(local)
+    local[invalid] = shapely.make_valid(local[invalid])
+    pairs = pd.DataFrame({
+        "plant": plants.index.to_numpy()[plant_idx],
+        "feature": index["part_feature"][part_idx],
+        "area_km2": shapely.area(shapely.intersection(local, disk)),
+    })
+    # A MultiPolygon can reach a catchment with several parts: one row per (plant, feature)
+    return pairs.groupby(["plant", "feature"], as_index=False)["area_km2"].sum()
+
+
+def catchment_pairs(geojson_file, radius_km):
+    """
+    One row per (plant, overlay feature) within radius_km: plant is the
+    load_points() index, feature the layer's feature position and area_km2
+    the feature area inside the catchment. Cached per (layer, radius).
+    """
+    return _catchment_pairs(geojson_file, overlay_version(geojson_file), points_version(), float(radius_km))
+
+
+@lru_cache(maxsize=32)
+def _feature_districts(geojson_file, version):
+    properties = overlay_index(geojson_file)["overlay"]["properties"]
+    districts = properties["districts"] if "districts" in properties.columns else pd.Series(None, index=properties.index)
+    exploded = pd.DataFrame({"district": districts.map(property_list)}).explode("district")
+    exploded = exploded.dropna().rename_axis("feature").reset_index()
+    # Each district gets an equal share of the feature, like the aggregation cube's overlay areas
+    exploded["share"] = 1.0 / exploded.groupby("feature")["district"].transform("size")
+    return exploded
+
+
+def catchment_districts(geojson_file, radius_km):
+    """
+    District breakdown per plant: features and overlay area (km²) by district.
+    A feature spanning several districts counts towards each of them, with its
+    area split evenly between them, so a plant's district areas add up to its
+    catchment area (less that of features without districts).
+    """
+    pairs = catchment_pairs(geojson_file, radius_km)
+    districts = _feature_districts(geojson_file, overlay_version(geojson_file))
+    pairs = pairs.merge(districts, on="feature")
+    pairs["area_km2"] = pairs["area_km2"] * pairs["share"]
+    return (pairs
+            .groupby(["plant", "district"], as_index=False)
+            .agg(features=("feature", "size"), area_km2=("area_km2", "sum")))
+
+
+@lru_cache(maxsize=32)
+def _catchment_table(geojson_file, version, sites_version, radius_km):
+    plants = _plants()
+    pairs = catchment_pairs(geojson_file, radius_km)
+    per_plant = pairs.groupby("plant").agg(features=("feature", "size"), area_km2=("area_km2", "sum"))
+    districts = catchment_districts(geojson_file, radius_km)
+    district_text = (districts.sort_values(["plant", "area_km2"], ascending=[True, False])
+                     .groupby("plant")["district"].agg(", ".join))
+
+    table = plants[["source_type", "name", "state", "district"]].copy()
+    table["features"] = per_plant["features"].reindex(plants.index, fill_value=0).to_numpy(dtype="int64")
+    table["area_km2"] = per_plant["area_km2"].reindex(plants.index, fill_value=0.0).round(2).to_numpy()
+    table["catchment_districts"] = district_text.reindex(plants.index).fillna("").to_numpy()
+    return table
+
+
+def catchment_table(geojson_file, radius_km):
+    """
+    One row per steel plant (indexed like load_points()) with the number of
+    overlay features and the overlay area (km²) within radius_km, plus the
+    districts of those features ordered by area. Cached per (layer, radius).
+    """
+    return _catchment_table(geojson_file, overlay_version(geojson_file), points_version(), float(radius_km))
+
+
+if __name__ == "__main__":
+    # Check that the district breakdown adds up to each plant's catchment area
+    import glob
+
+    for geojson_file in sorted(glob.glob("enhanced_*.geojson")):
+        for radius_km in CATCHMENT_RADII_KM:
+            pairs = catchment_pairs(geojson_file, radius_km)
+            mapped = pairs["feature"].isin(_feature_districts(geojson_file, overlay_version(geojson_file))["feature"])
+            # Plants whose features all have districts must match the catchment table exactly
+            complete = pairs.groupby("plant")["feature"].size().index.difference(pairs.loc[~mapped, "plant"])
+            expected = catchment_table(geojson_file, radius_km)["area_km2"].reindex(complete)
+            actual = catchment_districts(geojson_file, radius_km).groupby("plant")["area_km2"].sum().reindex(complete)
+            mismatched = int((~np.isclose(actual, expected, atol=0.01)).sum())
+            if mismatched:
+                print(f"❌ {geojson_file} ({radius_km} km): {mismatched} plants' district areas differ from their catchment area")
+            else:
+                print(f"✅ {geojson_file} ({radius_km} km): district areas add up for {len(complete)} plants")
@@ -0,0 +1,273 @@
+"""
+Declarative registry of the point data sources shown on the dashboard.
+Each entry declares the source file, the columns to load and their dtypes,
+where the coordinates, name, state and district live, and which extra fields
+belong on the detail card. Every source is normalized once into the canonical
+schema below and cached for the lifetime of the process, keyed by the source
+file's version so an updated file is picked up without a restart.
+
+The hot frame kept per source is compact: an int32 row_id (position within
+the source), categorical source_type/state/district, Arrow-backed names and
+float32 coordinates. Detail-only fields (capacities, links, addresses, ...)
+live in a separate frame indexed by row_id and are joined only for the rows
+that are actually displayed.
+"""
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from boundary_store import boundary_version, store_version
+from coordinates import coordinate_issues, parse_coordinate
+from snapshot_cache import read_snapshot, read_snapshot_columns, snapshot_columns_version
+
+CANONICAL_COLUMNS = ["row_id", "source_type", "name", "latitude", "longitude", "state", "district"]
+CATEGORICAL_COLUMNS = ["source_type", "state", "district"]
+# Derived snapshot columns written by the reverse geocoding stage (reverse_geocoder.py)
+REGIONS_SNAPSHOT = "regions"
+
+DATASETS = {
+    "Steel Plants": {
+        "file": "steel_plant_data.xlsx",
+        "columns": ["Plant Name", "Capacity(MTPA)", "Operational", "Furnance", "Source",
+                    "Latitude", "Longitude", "state", "district"],
+        "dtypes": {"Capacity(MTPA)": "float64"},
+        "lat": "Latitude",
+        "lon": "Longitude",
+        "name": "Plant Name",
+        "state": ["state"],
+        "district": ["district"],
+        "details": ["Capacity(MTPA)", "Furnance", "Operational", "Source"],
+        # Detail card lines (see detail_cards.py); sources without one get a line per details column
+        "card": {
+            "fields": [("Capacity (MTPA)", "{Capacity(MTPA)}"), ("Furnace Type", "{Furnance}"),
+                       ("Operational Status", "{Operational}")],
+            "links": [("Source", "Source", "Visit Link")],
+        },
+        # Detail columns summed per state/district in the aggregation cube: {cube column: column}
+        "measures": {"steel_capacity_mtpa": "Capacity(MTPA)"},
+        "color": "purple",
+    },
+    "Steel Plants with BF": {
+        "file": "steel_plant_bf.xlsx",
+        "columns": ["Plant", "Quantity", "Lat", "Long", "State", "District"],
+        "dtypes": {"Quantity": "float64"},
+        "lat": "Lat",
+        "lon": "Long",
+        "name": "Plant",
+        "state": ["State"],
+        "district": ["District"],
+        "details": ["Quantity"],
+        "card": {
+            "fields": [("Blast Furnace Capacity", "{Quantity} Mtpa"), ("State", "{state}"), ("District", "{district}")],
+        },
+        # Extra hover lines shown after the name: (label, column, suffix)
+        "hover": [("Capacity", "Quantity", " Mtpa")],
+        "measures": {"bf_capacity_mtpa": "Quantity"},
+        "color": "red",
+    },
+    "Geocoded Companies": {
+        "file": "geocoded_combined_companies.xlsx",
+        "columns": ["Company_Name", "Sales_Revenue", "City", "Country", "Company_URL",
+                    "Latitude", "Longitude", "state", "district"],
+        "dtypes": {"Sales_Revenue": "float64"},
+        "lat": "Latitude",
+        "lon": "Longitude",
+        "name": "Company_Name",
+        "state": ["state"],
+        "district": ["district"],
+        "details": ["Sales_Revenue", "City", "Country", "Company_URL"],
+        "card": {
+            "fields": [("Sales Revenue", "{Sales_Revenue}"), ("City", "{City}"), ("State", "{state}"),
+                       ("Country", "{Country}")],
+            "links": [("Website", "Company_URL", "Visit Site")],
+        },
+        "color": "green",
+    },
+    "Rice Mills": {
+        "file": "ricemills.csv",
+        "columns": ["name", "address", "phone", "email", "lat", "lng", "url", "rating_count",
+                    "star_count", "country", "state", "zip", "facebook_link", "instagram_link",
+                    "twitter_link", "whatsapp_link", "tiktok_link", "linkedin_link",
+                    "youtube_link", "primary_category_name", "detailed_state", "detailed_district"],
+        "dtypes": {"phone": "string", "zip": "string"},
+        "lat": "lat",
+        "lon": "lng",
+        "name": "name",
+        "state": ["detailed_state", "state"],
+        "district": ["detailed_district"],
+        # Mills without a detailed district fall back to the second-last address part
+        # (only until reverse_geocoder.py has written regions for the snapshot)
+        "district_from_address": "address",
+        "details": ["address", "phone", "email", "country", "zip", "star_count", "rating_count",
+                    "primary_category_name", "url", "facebook_link", "instagram_link",
+                    "twitter_link", "linkedin_link", "youtube_link", "whatsapp_link",
+                    "tiktok_link"],
+        "card": {
+            "fields": [("Address", "{address}"), ("Phone", "{phone}"), ("Email", "{email}"), ("State", "{state}"),
+                       ("Country", "{country}"), ("ZIP", "{zip}"), ("Rating", "{star_count} ({rating_count} reviews)"),
+                       ("Category", "{primary_category_name}")],
+            "links": [("Website", "url", "Visit Site")],
+            "social": [("Facebook", "facebook_link"), ("Instagram", "instagram_link"), ("Twitter", "twitter_link"),
+                       ("LinkedIn", "linkedin_link"), ("YouTube", "youtube_link"), ("WhatsApp", "whatsapp_link"),
+                       ("TikTok", "tiktok_link")],
+        },
+        "color": "orange",
+        # Dense layer: drawn as grid clusters below point_clusters.CLUSTER_MAX_ZOOM
+        "cluster": True,
+    },
+}
+
+
+def _reader_for(path):
+    return pd.read_csv if path.lower().endswith(".csv") else pd.read_excel
+
+
+def _coalesce(df, columns):
+    """First non-null value across columns, row by row"""
+    present = [col for col in columns if col in df.columns]
+    if not present:
+        return pd.Series(None, index=df.index, dtype=object)
+    result = df[present[0]]
+    for col in present[1:]:
+        result = result.fillna(df[col])
+    return result
+
+
+def _district_from_address(address):
+    parts = address.str.split(",")
+    return parts.str[-2].str.strip().where(parts.str.len() >= 2)
+
+
+def dataset_version(source):
+    """
+    Cheap version key for a source: its file's size and mtime, and the versions
+    of its geocoded regions and of the boundaries they must have been made from
+    """
+    path = DATASETS[source]["file"]
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns, snapshot_columns_version(path, REGIONS_SNAPSHOT), store_version()
+
+
+def read_source(source):
+    """Raw rows of a source through its Parquet snapshot, with the declared columns and dtypes"""
+    spec = DATASETS[source]
+    return read_snapshot(spec["file"], _reader_for(spec["file"]), usecols=spec["columns"], dtype=spec.get("dtypes"))
+
+
+def _compact(df):
+    df["row_id"] = np.arange(len(df), dtype="int32")
+    df["name"] = df["name"].astype("string[pyarrow]")
+    df["latitude"] = df["latitude"].astype("float32")
+    df["longitude"] = df["longitude"].astype("float32")
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype("category")
+    return df[CANONICAL_COLUMNS]
+
+
+# One entry per source in steady state; superseded versions are evicted
+@lru_cache(maxsize=len(DATASETS))
+def _load_dataset(source, version):
+    spec = DATASETS[source]
+    raw = read_source(source)
+    # State/district from point-in-polygon geocoding fill in what the source lacks,
+    # unless the boundary files changed since they were geocoded
+    regions = read_snapshot_columns(spec["file"], REGIONS_SNAPSHOT, boundaries=boundary_version())
+
+    df = pd.DataFrame(index=raw.index)
+    df["source_type"] = source
+    df["name"] = raw[spec["name"]]
+    df["latitude"] = parse_coordinate(raw[spec["lat"]])
+    df["longitude"] = parse_coordinate(raw[spec["lon"]])
+    df["state"] = _coalesce(raw, spec["state"])
+    df["district"] = _coalesce(raw, spec["district"])
+    if regions is not None:
+        df["state"] = df["state"].fillna(pd.Series(regions["geo_state"].to_numpy(), index=raw.index))
+        df["district"] = df["district"].fillna(pd.Series(regions["geo_district"].to_numpy(), index=raw.index))
+    elif spec.get("district_from_address") in raw.columns:
+        df["district"] = df["district"].fillna(_district_from_address(raw[spec["district_from_address"]]))
+
+    issues = coordinate_issues(raw[spec["lat"]], raw[spec["lon"]], df["latitude"], df["longitude"])
+    valid = issues.isna()
+    invalid = df[~valid].join(raw.loc[~valid, spec["details"]]).assign(coordinate_issue=issues[~valid])
+
+    details = raw.loc[valid, spec["details"]].reset_index(drop=True)
+    details.index = pd.Index(np.arange(len(details), dtype="int32"), name="row_id")
+    return _compact(df[valid].reset_index(drop=True)), details, invalid
+
+
+def load_dataset(source):
+    """Return the compact hot frame for a registered source (shared, do not mutate)"""
+    return _load_dataset(source, dataset_version(source))[0]
+
+
+def load_details(source, row_ids=None):
+    """Detail-only fields of a source indexed by row_id, optionally for the given rows only"""
+    details = _load_dataset(source, dataset_version(source))[1]
+    return details if row_ids is None else details.iloc[row_ids]
+
+
+def invalid_coordinates(source):
+    """Rows of a source dropped for missing, unparseable or out-of-range coordinates (with coordinate_issue)"""
+    return _load_dataset(source, dataset_version(source))[2]
+
+
+@lru_cache(maxsize=4)
+def _load_points(versions):
+    points = pd.concat([load_dataset(source) for source in DATASETS], ignore_index=True)
+    # Re-categorize after concat so all sources share one set of categories
+    for col in CATEGORICAL_COLUMNS:
+        points[col] = points[col].astype("category")
+    return points
+
+
+def points_version():
+    """Version key of load_points(): changes whenever any source file does"""
+    return tuple(dataset_version(source) for source in DATASETS)
+
+
+def load_points():
+    """One compact hot frame with every registered source, shared across sessions"""
+    return _load_points(points_version())
+
+
+def _text(values, missing):
+    values = pd.Series(values).astype(object)
+    return values.where(values.notna(), missing).astype(str).to_numpy()
+
+
+def hover_data(df, source):
+    """
+    customdata array and hovertemplate for a source's map markers, built from
+    whole columns. Extra lines come from the source's "hover" declaration.
+    """
+    hover_fields = DATASETS[source].get("hover", [])
+    extra = [column for _, column, _ in hover_fields if column not in df.columns]
+    if extra:
+        df = df.reset_index(drop=True).join(
+            load_details(source, df["row_id"].to_numpy())[extra].reset_index(drop=True))
+
+    columns = [_text(df["name"], "Unknown"), _text(df["district"], "Unknown"), _text(df["state"], "Unknown")]
+    lines = ["<b>%{customdata[0]}</b>"]
+    for i, (label, column, suffix) in enumerate(hover_fields, start=3):
+        columns.append(_text(df[column], "N/A"))
+        lines.append(f"{label}: %{{customdata[{i}]}}{suffix}")
+    lines += ["District: %{customdata[1]}", "State: %{customdata[2]}"]
+    return np.column_stack(columns), "<br>".join(lines) + "<extra></extra>"
+
+
+def memory_report():
+    """Per-source row counts and deep memory use (bytes) of the hot and detail frames"""
+    rows = []
+    for source in DATASETS:
+        hot = load_dataset(source)
+        details = load_details(source)
+        rows.append({
+            "source_type": source,
+            "rows": len(hot),
+            "hot_bytes": int(hot.memory_usage(deep=True).sum()),
+            "detail_bytes": int(details.memory_usage(deep=True).sum()),
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,77 @@
+"""
+Detail card payloads for the search results.
+The card of every row of a source is rendered once per dataset version into a
+single Markdown/HTML string (built column-wise, not row by row), so a results
+page only emits one expander and one markdown call per visible card.
+
+Each source declares its card as "card" in dataset_registry.DATASETS: "fields"
+are (label, template) lines where template names columns in braces, "links"
+are (label, column, link text) lines shown as a link when the value is a URL,
+and "social" are (label, column) links gathered on one "Social Media" line.
+A source without a "card" gets one plain line per "details" column.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from dataset_registry import DATASETS, dataset_version, load_dataset, load_details
+
+MISSING = "N/A"
+
+
+def _text(values):
+    values = pd.Series(values).astype(object)
+    return values.where(values.notna(), MISSING).astype(str)
+
+
+def _is_url(values):
+    return pd.Series(values).astype("string").str.startswith("http").fillna(False).astype(bool)
+
+
+def _fill(template, frame):
+    """Vectorized template: literal text between {column} references"""
+    result = pd.Series("", index=frame.index, dtype=object)
+    rest = template
+    while "{" in rest:
+        literal, _, rest = rest.partition("{")
+        column, _, rest = rest.partition("}")
+        result = result + literal + _text(frame[column]).to_numpy()
+    return result + rest
+
+
+def _card_spec(source):
+    """The source's declared card, or a generic one listing its detail columns"""
+    spec = DATASETS[source]
+    return spec.get("card") or {"fields": [(column, f"{{{column}}}") for column in spec["details"]]}
+
+
+# Bounded like dataset_registry._load_dataset: rendered cards of replaced versions are dropped
+@lru_cache(maxsize=len(DATASETS))
+def _card_payloads(source, version):
+    spec = _card_spec(source)
+    frame = load_dataset(source).reset_index(drop=True).join(load_details(source).reset_index(drop=True))
+    lines = [_fill(f"**{label}:** {template}", frame) for label, template in spec.get("fields", [])]
+    for label, column, link_text in spec.get("links", []):
+        url = _is_url(frame[column])
+        link = f"**{label}:** <a href='" + frame[column].astype(object).where(url, "").astype(str) + f"' target='_blank'>{link_text}</a>"
+        lines.append(link.where(url, f"**{label}:** " + _text(frame[column])))
+    lines = [line.to_numpy(dtype=object) for line in lines]
+    payload = pd.Series(["  \n".join(parts) for parts in zip(*lines)] if lines else "", index=frame.index, dtype=object)
+
+    social = []
+    for label, column in spec.get("social", []):
+        url = _is_url(frame[column])
+        social.append(("<a href='" + frame[column].astype(object).where(url, "").astype(str)
+                       + f"' target='_blank'>{label}</a>").where(url, ""))
+    if social:
+        social = [links.to_numpy(dtype=object) for links in social]
+        joined = pd.Series([" | ".join(part for part in parts if part) for parts in zip(*social)], index=frame.index)
+        payload = payload.where(joined == "", payload + "  \n**Social Media:** " + joined)
+    return payload.to_numpy()
+
+
+def card_payloads(source, row_ids):
+    """Markdown card bodies for rows of a source (by row_id), built once per dataset version"""
+    return _card_payloads(source, dataset_version(source))[np.asarray(row_ids)]
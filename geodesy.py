@@ -0,0 +1,94 @@
+"""
+Vectorized distance helpers on the WGS84 sphere approximation.
+Everything works on whole NumPy arrays of lon/lat in degrees; distances are
+in kilometres.
+"""
+
+import numpy as np
+import shapely
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LON_EQUATOR = 111.320
+
+
+def haversine_km(lon1, lat1, lon2, lat2):
+    """Great-circle distance between (lon1, lat1) and (lon2, lat2), broadcasting"""
+    lon1, lat1, lon2, lat2 = (np.radians(np.asarray(v, dtype="float64")) for v in (lon1, lat1, lon2, lat2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def unit_vectors(lon, lat):
+    """(n, 3) unit-sphere XYZ of lon/lat points; chord length is monotonic in great-circle distance"""
+    lon = np.radians(np.asarray(lon, dtype="float64"))
+    lat = np.radians(np.asarray(lat, dtype="float64"))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def chord_for_km(km):
+    """Unit-sphere chord length spanning a great-circle distance of km"""
+    return 2 * np.sin(np.asarray(km, dtype="float64") / (2 * EARTH_RADIUS_KM))
+
+
+def km_for_chord(chord):
+    """Great-circle distance (km) spanned by a unit-sphere chord"""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord, dtype="float64") / 2, 0, 1))
+
+
+def degrees_for_km(km, lat):
+    """Conservative degree radius covering km around latitude lat (for index candidate queries)"""
+    cos_lat = np.cos(np.radians(np.minimum(np.abs(np.asarray(lat, dtype="float64")) + km / KM_PER_DEGREE_LAT, 89.0)))
+    return km / (KM_PER_DEGREE_LON_EQUATOR * cos_lat)
+
+
+def to_local_km(geometries, lon0, lat0):
+    """
+    Re-express each geometry in a local equirectangular frame (km) centred on
+    its own (lon0[i], lat0[i]). Accurate to well under 1% within a few hundred km,
+    which is enough for catchment radii and "within N km" joins.
+    """
+    geometries = np.asarray(geometries, dtype=object)
+    coords, index = shapely.get_coordinates(geometries, return_index=True)
+    lon0 = np.broadcast_to(np.asarray(lon0, dtype="float64"), geometries.shape)[index]
+    lat0 = np.broadcast_to(np.asarray(lat0, dtype="float64"), geometries.shape)[index]
+    local = np.column_stack([
+        (coords[:, 0] - lon0) * KM_PER_DEGREE_LON_EQUATOR * np.cos(np.radians(lat0)),
+        (coords[:, 1] - lat0) * KM_PER_DEGREE_LAT,
+    ])
+    return shapely.set_coordinates(geometries.copy(), local)
+
+
+def geodesic_rings(lon, lat, radii_km, n_points=64):
+    """
+    Closed rings of constant great-circle distance radii_km[j] around every
+    centre (lon[i], lat[i]), for all centres and radii in one broadcasted call.
+    Returns (lon, lat) arrays of shape (N, M, n_points + 1) in degrees; the
+    last vertex repeats the first.
+    """
+    lon = np.radians(np.asarray(lon, dtype="float64").reshape(-1, 1, 1))
+    lat = np.radians(np.asarray(lat, dtype="float64").reshape(-1, 1, 1))
+    angular = np.asarray(radii_km, dtype="float64").reshape(1, -1, 1) / EARTH_RADIUS_KM
+    bearing = np.linspace(0, 2 * np.pi, n_points + 1).reshape(1, 1, -1)
+
+    # Destination point given start, bearing and angular distance on the sphere
+    ring_lat = np.arcsin(np.sin(lat) * np.cos(angular) + np.cos(lat) * np.sin(angular) * np.cos(bearing))
+    ring_lon = lon + np.arctan2(np.sin(bearing) * np.sin(angular) * np.cos(lat),
+                                np.cos(angular) - np.sin(lat) * np.sin(ring_lat))
+    ring_lon = (np.degrees(ring_lon) + 180) % 360 - 180
+    ring_lat = np.degrees(ring_lat)
+    ring_lat[..., -1] = ring_lat[..., 0]
+    ring_lon[..., -1] = ring_lon[..., 0]
+    return ring_lon, ring_lat
+
+
+def packed_geodesic_rings(lon, lat, radii_km, n_points=64):
+    """
+    geodesic_rings flattened into two 1-D arrays with a NaN after every ring,
+    ready to draw all N × M rings as a single map line trace.
+    """
+    ring_lon, ring_lat = geodesic_rings(lon, lat, radii_km, n_points)
+    gap = np.full(ring_lon.shape[:-1] + (1,), np.nan)
+    return (np.concatenate([ring_lon, gap], axis=-1).ravel(),
+            np.concatenate([ring_lat, gap], axis=-1).ravel())
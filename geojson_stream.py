@@ -0,0 +1,187 @@
+"""
+Streaming GeoJSON / JSON I/O for the preprocessing outputs.
+Writers emit a FeatureCollection (or a mapping_*.json object) one feature /
+entry at a time with compact separators, optionally trimming coordinates to a
+number of decimals and gzip-compressing when the path ends with .gz. They
+write to a temporary file and replace the target at the end, so a layer can
+be streamed from and back into the same file.
+
+Readers pull the text in CHUNK_CHARS pieces and json.raw_decode one feature /
+entry at a time, so memory stays at about one chunk plus one feature however
+large the layer is. Gzip input is detected from its magic bytes.
+"""
+
+import gzip
+import json
+import os
+
+CHUNK_CHARS = 1 << 20
+COMPACT_SEPARATORS = (",", ":")
+GZIP_MAGIC = b"\x1f\x8b"
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def _open_read(path):
+    with open(path, "rb") as f:
+        compressed = f.read(2) == GZIP_MAGIC
+    return gzip.open(path, "rt", encoding="utf-8") if compressed else open(path, "r", encoding="utf-8")
+
+
+def _open_write(path, compress):
+    return gzip.open(path, "wt", encoding="utf-8", compresslevel=6) if compress else open(path, "w", encoding="utf-8")
+
+
+def round_coordinates(coordinates, precision):
+    """Nested GeoJSON coordinate lists rounded to precision decimals"""
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        return [round(value, precision) for value in coordinates]
+    return [round_coordinates(part, precision) for part in coordinates]
+
+
+def trim_precision(geometry, precision):
+    """Copy of a GeoJSON geometry with its coordinates rounded to precision decimals"""
+    if not geometry:
+        return geometry
+    if geometry.get("type") == "GeometryCollection":
+        return {**geometry, "geometries": [trim_precision(part, precision) for part in geometry.get("geometries", [])]}
+    if geometry.get("coordinates") is None:
+        return geometry
+    return {**geometry, "coordinates": round_coordinates(geometry["coordinates"], precision)}
+
+
+def _write_stream(path, head, parts, tail):
+    """Write head, the comma-joined parts and tail to path atomically; returns the number of parts"""
+    tmp_path = f"{path}.tmp"
+    count = 0
+    try:
+        with _open_write(tmp_path, compress=path.endswith(".gz")) as f:
+            f.write(head)
+            for part in parts:
+                if count:
+                    f.write(",")
+                f.write(part)
+                count += 1
+            f.write(tail)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Leave no partial output behind when a feature or a write fails (or the run is interrupted)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+def write_feature_collection(path, features, precision=None):
+    """
+    Stream features (any iterable of GeoJSON feature dicts) to path as one
+    compact FeatureCollection; coordinates are rounded to precision decimals
+    when given. Returns the number of features written.
+    """
+    def encoded():
+        for feature in features:
+            if precision is not None and feature.get("geometry"):
+                feature = {**feature, "geometry": trim_precision(feature["geometry"], precision)}
+            yield json.dumps(feature, separators=COMPACT_SEPARATORS)
+
+    return _write_stream(path, '{"type":"FeatureCollection","features":[', encoded(), "]}")
+
+
+def write_mapping(path, items):
+    """Stream (key, value) pairs to path as one compact JSON object; returns the number of entries"""
+    encoded = (f"{json.dumps(str(key))}:{json.dumps(value, separators=COMPACT_SEPARATORS)}" for key, value in items)
+    return _write_stream(path, "{", encoded, "}")
+
+
+def _fill(state, grow=False):
+    """Drop consumed text and append the next chunk (at least doubling when grow); False at end of file"""
+    size = max(state["chunk"], len(state["text"]) - state["pos"]) if grow else state["chunk"]
+    chunk = state["file"].read(size)
+    state["text"] = state["text"][state["pos"]:] + chunk
+    state["pos"] = 0
+    return bool(chunk)
+
+
+def _peek(state):
+    """Next non-whitespace character, "" at end of file"""
+    while True:
+        text, pos = state["text"], state["pos"]
+        while pos < len(text) and text[pos] in _WHITESPACE:
+            pos += 1
+        state["pos"] = pos
+        if pos < len(text):
+            return text[pos]
+        if not _fill(state):
+            return ""
+
+
+def _expect(state, characters):
+    """Consume the next non-whitespace character, which must be one of characters"""
+    character = _peek(state)
+    if not character or character not in characters:
+        raise ValueError(f"Expected one of {characters!r} in JSON stream, found {character or 'end of file'!r}")
+    state["pos"] += 1
+    return character
+
+
+def _value(state):
+    """Decode the next complete JSON value, reading more text until it fits"""
+    _peek(state)
+    while True:
+        try:
+            value, end = _decoder.raw_decode(state["text"], state["pos"])
+        except json.JSONDecodeError:
+            if not _fill(state, grow=True):
+                raise
+            continue
+        # A number ending exactly at the buffer end may continue in the next chunk
+        if end == len(state["text"]) and _fill(state):
+            continue
+        state["pos"] = end
+        return value
+
+
+def _object_items(state, stream_key=None):
+    """
+    (key, value) pairs of the JSON object at the stream position. The value of
+    stream_key must be an array and is yielded as (stream_key, element) per element.
+    """
+    _expect(state, "{")
+    if _peek(state) == "}":
+        state["pos"] += 1
+        return
+    while True:
+        key = _value(state)
+        _expect(state, ":")
+        if key == stream_key:
+            _expect(state, "[")
+            if _peek(state) == "]":
+                state["pos"] += 1
+            else:
+                while True:
+                    yield key, _value(state)
+                    if _expect(state, ",]") == "]":
+                        break
+        else:
+            yield key, _value(state)
+        if _expect(state, ",}") == "}":
+            return
+
+
+def _stream(path, chunk_chars, stream_key=None):
+    with _open_read(path) as f:
+        state = {"file": f, "text": "", "pos": 0, "chunk": chunk_chars}
+        yield from _object_items(state, stream_key)
+
+
+def iter_features(path, chunk_chars=CHUNK_CHARS):
+    """Yield the features of a GeoJSON FeatureCollection file one at a time"""
+    for key, value in _stream(path, chunk_chars, stream_key="features"):
+        if key == "features":
+            yield value
+
+
+def iter_mapping(path, chunk_chars=CHUNK_CHARS):
+    """Yield the (key, value) entries of a JSON object file such as mapping_*.json one at a time"""
+    yield from _stream(path, chunk_chars)
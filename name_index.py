@@ -0,0 +1,157 @@
+"""
+Trigram inverted index over the names of every point source, for the
+dashboard's name search. Built once per dataset version and kept as CSR
+arrays: each distinct trigram of the lower-cased, space-padded names maps to
+the sorted positions (in load_points()) of the names containing it.
+
+A query of three or more characters intersects the posting lists of its
+trigrams (shortest first) and confirms the substring on the few remaining
+candidates, so the cost follows the rarest trigram instead of the number of
+names. Shorter queries fall back to one vectorized substring scan. When
+nothing contains the query, names are ranked by trigram similarity instead
+(the share of the query's trigrams a name contains), so typos still find
+results.
+
+Results are ranked: exact name, then name prefix, then word prefix, then any
+other substring (shorter names first within each group), then fuzzy matches
+by similarity.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from dataset_registry import load_points, points_version
+
+MIN_SIMILARITY = 0.5
+# Posting lists intersected per query; the substring check filters the rest
+MAX_INTERSECTIONS = 3
+# Names converted to trigrams per vectorized block while building
+BUILD_BLOCK = 50000
+# Characters per trigram code: 3 x 21 bits (any Unicode code point) in an int64
+_CODE_BITS = 21
+
+
+def _trigram_codes(text):
+    """Distinct int64 trigram codes of a lower-cased name, padded so word starts count"""
+    padded = f"  {text} "
+    codes = {(ord(padded[i]) << (2 * _CODE_BITS)) | (ord(padded[i + 1]) << _CODE_BITS) | ord(padded[i + 2])
+             for i in range(len(padded) - 2)}
+    return np.fromiter(codes, dtype="int64", count=len(codes))
+
+
+def _name_trigrams(names):
+    """(row, code) pairs of the distinct trigrams of every name, without a Python loop per name"""
+    padded = np.char.add(np.char.add("  ", names.astype(str)), " ")
+    width = padded.dtype.itemsize // 4
+    chars = padded.view("uint32").reshape(len(padded), width).astype("int64")
+    codes = (chars[:, :-2] << (2 * _CODE_BITS)) | (chars[:, 1:-1] << _CODE_BITS) | chars[:, 2:]
+    # Windows reaching past a name's end include the zero fill
+    valid = chars[:, 2:] != 0
+    rows = np.broadcast_to(np.arange(len(padded))[:, None], codes.shape)[valid]
+    return rows, codes[valid]
+
+
+@lru_cache(maxsize=2)
+def _name_index(sites_version):
+    names = load_points()["name"].fillna("").astype(str).str.lower().to_numpy(dtype=object)
+    rows, codes = [], []
+    for start in range(0, len(names), BUILD_BLOCK):
+        block_rows, block_codes = _name_trigrams(names[start:start + BUILD_BLOCK])
+        rows.append(block_rows + start)
+        codes.append(block_codes)
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype="int64")
+    codes = np.concatenate(codes) if codes else np.empty(0, dtype="int64")
+
+    # Sort by (trigram, row) and drop repeated trigrams within a name
+    order = np.lexsort((rows, codes))
+    codes, rows = codes[order], rows[order].astype("int32")
+    distinct = np.r_[True, (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])] if len(codes) else np.zeros(0, dtype=bool)
+    codes, rows = codes[distinct], rows[distinct]
+    keys, starts = np.unique(codes, return_index=True)
+    return {
+        "names": names,
+        "arrow_names": pa.array(names, type=pa.string()),
+        "trigram_counts": np.bincount(rows, minlength=len(names)),
+        "keys": keys,
+        "offsets": np.append(starts, len(codes)),
+        "postings": rows,
+    }
+
+
+def name_index():
+    """Trigram index of load_points() names (cached per dataset version)"""
+    return _name_index(points_version())
+
+
+def _postings(index, codes):
+    """Posting list of every query trigram (empty for trigrams no name has)"""
+    position = np.searchsorted(index["keys"], codes)
+    found = (position < len(index["keys"])) & (index["keys"][np.minimum(position, len(index["keys"]) - 1)] == codes)
+    return [index["postings"][index["offsets"][p]:index["offsets"][p + 1]] if ok else index["postings"][:0]
+            for p, ok in zip(position, found)]
+
+
+def _substring_matches(index, query):
+    if len(query) < 3:
+        mask = pc.match_substring(index["arrow_names"], query).to_numpy(zero_copy_only=False)
+        return np.flatnonzero(mask)
+    # Trigrams inside the query only (no padding): every name containing it has them all
+    inner = {query[i:i + 3] for i in range(len(query) - 2)}
+    codes = np.array([(ord(t[0]) << (2 * _CODE_BITS)) | (ord(t[1]) << _CODE_BITS) | ord(t[2]) for t in inner], dtype="int64")
+    lists = sorted(_postings(index, codes), key=len)[:MAX_INTERSECTIONS]
+    candidates = lists[0]
+    for posting in lists[1:]:
+        if not len(candidates):
+            break
+        candidates = np.intersect1d(candidates, posting, assume_unique=True)
+    found = pc.match_substring(index["arrow_names"].take(pa.array(candidates)), query)
+    return candidates[found.to_numpy(zero_copy_only=False)].astype("int64")
+
+
+def _rank_substring(index, query, rows):
+    names = index["arrow_names"].take(pa.array(rows))
+    exact = pc.equal(names, query).to_numpy(zero_copy_only=False)
+    prefix = pc.starts_with(names, query).to_numpy(zero_copy_only=False)
+    word = pc.match_substring(names, f" {query}").to_numpy(zero_copy_only=False)
+    group = np.select([exact, prefix, word], [0, 1, 2], 3)
+    lengths = pc.utf8_length(names).to_numpy(zero_copy_only=False)
+    order = np.lexsort((rows, lengths, group))
+    return rows[order], (4 - group[order]) / 4.0
+
+
+def _fuzzy_matches(index, query):
+    codes = _trigram_codes(query)
+    lists = _postings(index, codes)
+    if not any(len(p) for p in lists):
+        return np.empty(0, dtype="int64"), np.empty(0)
+    shared = np.bincount(np.concatenate(lists), minlength=len(index["names"]))
+    rows = np.flatnonzero(shared)
+    # Share of the query's trigrams found in the name; ties go to the closer overall match
+    similarity = shared[rows] / len(codes)
+    keep = similarity >= MIN_SIMILARITY
+    rows, similarity = rows[keep], similarity[keep]
+    overall = shared[rows] / (len(codes) + index["trigram_counts"][rows] - shared[rows])
+    order = np.lexsort((rows, -overall, -similarity))
+    return rows[order], similarity[order]
+
+
+def search_names(query, limit=None):
+    """
+    Positions in load_points() of the names matching query (case-insensitive),
+    best first, and their scores (1.0 exact name ... 0.25 substring; trigram
+    similarity below that for fuzzy matches).
+    """
+    query = query.strip().lower()
+    if not query:
+        return np.empty(0, dtype="int64"), np.empty(0)
+    index = name_index()
+    rows = _substring_matches(index, query)
+    if len(rows):
+        rows, scores = _rank_substring(index, query, rows)
+    else:
+        rows, scores = _fuzzy_matches(index, query)
+        scores = scores * 0.25
+    return rows[:limit], scores[:limit]
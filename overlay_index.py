@@ -0,0 +1,90 @@
+"""
+Spatial index per overlay layer for joining point sites against biomass layers.
+An STRtree over every polygon part (and point) of a layer is built once per
+layer version and answers bulk containment and within-distance queries for
+whole arrays of sites, instead of testing every point against every polygon.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from dataset_registry import load_points, points_version
+from geodesy import degrees_for_km, to_local_km
+from overlay_store import load_overlay, overlay_version, part_geometries
+
+
+@lru_cache(maxsize=16)
+def _overlay_index(geojson_file, version):
+    overlay = load_overlay(geojson_file)
+    geometries, part_feature = part_geometries(overlay)
+    present = np.flatnonzero(geometries != None)  # noqa: E711 (elementwise on object array)
+    geometries = geometries[present]
+    # Some source rings self-intersect; repair them once so overlay operations don't fail
+    invalid = ~shapely.is_valid(geometries)
+    geometries[invalid] = shapely.make_valid(geometries[invalid])
+    return {
+        "tree": shapely.STRtree(geometries),
+        "geometries": geometries,
+        "part_feature": part_feature[present],
+        "overlay": overlay,
+    }
+
+
+def overlay_index(geojson_file):
+    """STRtree index of a layer (cached per layer version)"""
+    return _overlay_index(geojson_file, overlay_version(geojson_file))
+
+
+def points_in_overlay(index, lon, lat):
+    """(point, feature) index pairs for points lying inside or on a layer geometry"""
+    points = shapely.points(np.asarray(lon, dtype="float64"), np.asarray(lat, dtype="float64"))
+    point_idx, geom_idx = index["tree"].query(points, predicate="intersects")
+    return point_idx, index["part_feature"][geom_idx]
+
+
+def parts_near_points(index, lon, lat, distance_km):
+    """
+    (point, part, distance_km) for every layer part within distance_km of a
+    point; part indexes index["geometries"]. The tree is queried with a
+    conservative degree radius, then each candidate pair is measured in a
+    local km frame around the point.
+    """
+    lon = np.asarray(lon, dtype="float64")
+    lat = np.asarray(lat, dtype="float64")
+    points = shapely.points(lon, lat)
+    point_idx, geom_idx = index["tree"].query(points, predicate="dwithin", distance=degrees_for_km(distance_km, lat))
+    local = to_local_km(index["geometries"][geom_idx], lon[point_idx], lat[point_idx])
+    distance = shapely.distance(local, shapely.points(0.0, 0.0))
+    keep = distance <= distance_km
+    return point_idx[keep], geom_idx[keep], distance[keep]
+
+
+def points_near_overlay(index, lon, lat, distance_km):
+    """(point, feature, distance_km) for every point within distance_km of a layer geometry"""
+    point_idx, geom_idx, distance = parts_near_points(index, lon, lat, distance_km)
+    return point_idx, index["part_feature"][geom_idx], distance
+
+
+@lru_cache(maxsize=32)
+def _site_overlay_flags(geojson_file, version, sites_version, distance_km):
+    points = load_points()
+    lon = points["longitude"].to_numpy(dtype="float64")
+    lat = points["latitude"].to_numpy(dtype="float64")
+    index = overlay_index(geojson_file)
+    inside = np.zeros(len(points), dtype=bool)
+    near = np.zeros(len(points), dtype=bool)
+    inside[points_in_overlay(index, lon, lat)[0]] = True
+    near[points_near_overlay(index, lon, lat, distance_km)[0]] = True
+    return pd.DataFrame({"inside": inside, "near": near | inside}, index=points.index)
+
+
+def site_overlay_flags(geojson_file, distance_km):
+    """
+    For every row of dataset_registry.load_points(): whether it lies inside the
+    layer and whether it lies within distance_km of it. Cached per
+    (layer version, sites version, distance).
+    """
+    return _site_overlay_flags(geojson_file, overlay_version(geojson_file), points_version(), float(distance_km))
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Pre-decoded binary store for the GeoJSON overlay layers.
+Each enhanced_*.geojson is converted once into flat NumPy arrays under
+.overlay_store/<layer>/ (a GeoArrow-style layout) plus a Parquet properties
+table, so selecting an overlay memory-maps a few .npy files instead of
+json-parsing and walking the nested coordinate lists on every rerun.
+
+Layout (all offsets are int64, lengths = count + 1):
+    coords.npy           float64 (n_vertices, 2) lon/lat
+    ring_offsets.npy     ring i      -> coords[ring_offsets[i]:ring_offsets[i+1]]
+    part_offsets.npy     polygon j   -> rings[part_offsets[j]:part_offsets[j+1]] (first ring = exterior)
+    feature_offsets.npy  feature k   -> parts[feature_offsets[k]:feature_offsets[k+1]]
+    geom_type.npy        int8 per feature (see GEOMETRY_TYPES)
+    properties.parquet   one row per feature, in the same order
+
+A Point is stored as one part with one single-vertex ring, so every geometry
+type shares the same offsets.
+
+Level-of-detail pyramid: lod1/, lod2/, ... hold the exterior ring of every
+part simplified (topology-preserving, per geometry) at LOD_TOLERANCES, as
+    coords.npy           float64 (n_vertices, 2)
+    part_offsets.npy     part j -> coords[part_offsets[j]:part_offsets[j+1]]
+Parts smaller than the tolerance are left empty at that level (the map keeps
+their tooltip anchor), as are points, which are always drawn from level 0.
+
+Build all layers ahead of time with: python overlay_store.py
+"""
+
+import glob
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from geojson_stream import iter_features
+
+STORE_DIR = ".overlay_store"
+FORMAT_VERSION = 2
+# Simplification tolerance (degrees) of pyramid levels 1..n; level 0 is full detail
+LOD_TOLERANCES = [0.005, 0.02, 0.05]
+GEOMETRY_TYPES = {"Point": 0, "MultiPoint": 1, "Polygon": 2, "MultiPolygon": 3}
+ARRAYS = ["coords", "ring_offsets", "part_offsets", "feature_offsets", "geom_type"]
+# Serializes store builds between the app's session threads
+_build_lock = threading.Lock()
+
+
+def _store_path(geojson_file):
+    return os.path.join(STORE_DIR, os.path.splitext(os.path.basename(geojson_file))[0])
+
+
+def _source_key(geojson_file):
+    stat = os.stat(geojson_file)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "format": FORMAT_VERSION}
+
+
+def _polygons(geometry):
+    """Normalize a geometry to a list of polygons (lists of rings), or None if unsupported"""
+    geom_type = geometry.get("type")
+    coords = geometry.get("coordinates")
+    if not coords:
+        return None
+    if geom_type == "Point":
+        return [[[coords]]]
+    if geom_type == "MultiPoint":
+        return [[[point]] for point in coords]
+    if geom_type == "Polygon":
+        return [coords]
+    if geom_type == "MultiPolygon":
+        return coords
+    return None
+
+
+def exterior_rings(overlay, level=0):
+    """(coords, starts, ends) of each part's exterior ring at a pyramid level"""
+    if level == 0:
+        exterior = np.asarray(overlay["part_offsets"][:-1])
+        ring_offsets = np.asarray(overlay["ring_offsets"])
+        return overlay["coords"], ring_offsets[exterior], ring_offsets[exterior + 1]
+    lod = overlay["levels"][level - 1]
+    offsets = np.asarray(lod["part_offsets"])
+    return lod["coords"], offsets[:-1], offsets[1:]
+
+
+def level_for_zoom(zoom):
+    """Coarsest pyramid level whose tolerance stays under ~one pixel at a Mapbox zoom"""
+    degrees_per_pixel = 360 / (256 * 2 ** zoom)
+    level = 0
+    for i, tolerance in enumerate(LOD_TOLERANCES, start=1):
+        if tolerance <= degrees_per_pixel:
+            level = i
+    return level
+
+
+def _ranges(starts, lengths):
+    """Concatenation of arange(starts[i], starts[i] + lengths[i]) for all i"""
+    starts = np.asarray(starts, dtype="int64")
+    lengths = np.asarray(lengths, dtype="int64")
+    return np.repeat(starts, lengths) + np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+
+def part_geometries(overlay):
+    """
+    Full-detail shapely geometry of every part (Polygon with holes, or Point)
+    and the feature index each part belongs to.
+    """
+    coords = np.asarray(overlay["coords"])
+    ring_offsets = np.asarray(overlay["ring_offsets"])
+    part_offsets = np.asarray(overlay["part_offsets"])
+    feature_offsets = np.asarray(overlay["feature_offsets"])
+    part_feature = np.repeat(np.arange(len(feature_offsets) - 1), np.diff(feature_offsets))
+    geometries = np.empty(len(part_feature), dtype=object)
+
+    exterior_length = ring_offsets[part_offsets[:-1] + 1] - ring_offsets[part_offsets[:-1]]
+    is_polygon = exterior_length >= 4
+    points = np.flatnonzero(~is_polygon & (exterior_length > 0))
+    geometries[points] = shapely.points(coords[ring_offsets[part_offsets[points]]])
+
+    polygons = np.flatnonzero(is_polygon)
+    if len(polygons):
+        rings_per_part = part_offsets[polygons + 1] - part_offsets[polygons]
+        rings = _ranges(part_offsets[polygons], rings_per_part)
+        ring_lengths = ring_offsets[rings + 1] - ring_offsets[rings]
+        linearrings = shapely.linearrings(coords[_ranges(ring_offsets[rings], ring_lengths)],
+                                          indices=np.repeat(np.arange(len(rings)), ring_lengths))
+        geometries[polygons] = shapely.polygons(linearrings, indices=np.repeat(np.arange(len(polygons)), rings_per_part))
+    return geometries, part_feature
+
+
+def _build_levels(arrays, store_path):
+    """Write the simplified exterior-ring pyramid for a freshly decoded layer"""
+    coords, starts, ends = exterior_rings(arrays)
+    lengths = ends - starts
+    # Single-vertex "rings" are points; rings need at least 4 closed vertices
+    polygon_parts = np.flatnonzero(lengths >= 4)
+    part_lengths = lengths[polygon_parts]
+    ring_index = np.repeat(np.arange(len(polygon_parts)), part_lengths)
+    vertex_index = _ranges(starts[polygon_parts], part_lengths)
+    polygons = shapely.polygons(shapely.linearrings(np.asarray(coords)[vertex_index], indices=ring_index)) \
+        if len(polygon_parts) else np.empty(0, dtype=object)
+    bounds = shapely.bounds(polygons).reshape(-1, 4)
+    extent = np.maximum(bounds[:, 2] - bounds[:, 0], bounds[:, 3] - bounds[:, 1])
+
+    for level, tolerance in enumerate(LOD_TOLERANCES, start=1):
+        simplified = shapely.get_exterior_ring(shapely.simplify(polygons, tolerance, preserve_topology=True))
+        simplified = np.where(extent >= tolerance, simplified, None)
+        level_coords, index = shapely.get_coordinates(simplified, return_index=True)
+        part_lengths = np.zeros(len(lengths), dtype="int64")
+        part_lengths[polygon_parts] = np.bincount(index, minlength=len(polygon_parts))
+        part_offsets = np.concatenate([[0], np.cumsum(part_lengths)])
+        level_path = os.path.join(store_path, f"lod{level}")
+        os.makedirs(level_path)
+        np.save(os.path.join(level_path, "coords.npy"), level_coords)
+        np.save(os.path.join(level_path, "part_offsets.npy"), part_offsets)
+
+
+def _write_properties(props, path):
+    table = pd.DataFrame(props)
+    try:
+        table.to_parquet(path, index=False)
+    except Exception:
+        # Mixed-type property values: keep them as JSON text
+        for col in table.columns:
+            if table[col].dtype == object:
+                table[col] = table[col].map(lambda v: v if v is None else json.dumps(v))
+        table.to_parquet(path, index=False)
+
+
+def build_overlay_store(geojson_file, replace=False):
+    """
+    Decode geojson_file once and write its binary store; returns the store path.
+    A store that another build made current meanwhile is kept unless replace.
+    """
+    rings, ring_offsets, part_offsets, feature_offsets = [], [0], [0], [0]
+    geom_types, props = [], []
+    n_vertices = 0
+    for index, feature in enumerate(iter_features(geojson_file)):
+        geometry = feature.get("geometry") or {}
+        polygons = _polygons(geometry)
+        if polygons is None:
+            continue
+        for polygon in polygons:
+            for ring in polygon:
+                ring = np.asarray(ring, dtype="float64").reshape(-1, np.shape(ring)[-1])[:, :2]
+                rings.append(ring)
+                n_vertices += len(ring)
+                ring_offsets.append(n_vertices)
+            part_offsets.append(len(ring_offsets) - 1)
+        feature_offsets.append(len(part_offsets) - 1)
+        geom_types.append(GEOMETRY_TYPES[geometry["type"]])
+        props.append({"source_index": index, **(feature.get("properties") or {})})
+
+    arrays = {
+        "coords": np.concatenate(rings) if rings else np.empty((0, 2)),
+        "ring_offsets": np.asarray(ring_offsets, dtype="int64"),
+        "part_offsets": np.asarray(part_offsets, dtype="int64"),
+        "feature_offsets": np.asarray(feature_offsets, dtype="int64"),
+        "geom_type": np.asarray(geom_types, dtype="int8"),
+    }
+
+    store_path = _store_path(geojson_file)
+    os.makedirs(STORE_DIR, exist_ok=True)
+    # Private build directory, so concurrent builds (other processes) never share files
+    tmp_path = tempfile.mkdtemp(dir=STORE_DIR, prefix=f"{os.path.basename(store_path)}.tmp")
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+        _write_properties(props, os.path.join(tmp_path, "properties.parquet"))
+        _build_levels(arrays, tmp_path)
+        with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+            json.dump({
+                "source": geojson_file,
+                **_source_key(geojson_file),
+                "features": len(geom_types),
+                "vertices": int(n_vertices),
+                "lod_tolerances": LOD_TOLERANCES,
+            }, f, indent=2)
+        # Publish unless another build already has; a current store is not removed under its readers
+        if replace or not _is_fresh(geojson_file):
+            shutil.rmtree(store_path, ignore_errors=True)
+            try:
+                os.rename(tmp_path, store_path)
+            except OSError:
+                if replace or not _is_fresh(geojson_file):
+                    raise
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    return store_path
+
+
+def _is_fresh(geojson_file):
+    try:
+        with open(os.path.join(_store_path(geojson_file), "meta.json"), "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return all(meta.get(key) == value for key, value in _source_key(geojson_file).items())
+
+
+@lru_cache(maxsize=16)
+def _load_overlay(geojson_file, key):
+    store_path = _store_path(geojson_file)
+    overlay = {name: np.load(os.path.join(store_path, f"{name}.npy"), mmap_mode="r") for name in ARRAYS}
+    overlay["properties"] = pd.read_parquet(os.path.join(store_path, "properties.parquet"))
+    overlay["levels"] = [
+        {name: np.load(os.path.join(store_path, f"lod{level}", f"{name}.npy"), mmap_mode="r")
+         for name in ["coords", "part_offsets"]}
+        for level in range(1, len(LOD_TOLERANCES) + 1)
+    ]
+    overlay["name"] = geojson_file
+    return overlay
+
+
+def overlay_version(geojson_file):
+    """Version key of a layer's store (changes whenever the GeoJSON does)"""
+    return tuple(_source_key(geojson_file).values())
+
+
+def load_overlay(geojson_file):
+    """
+    Memory-map the binary store of geojson_file, (re)building it first if it is
+    missing or older than the GeoJSON. Returns a dict of the arrays above plus
+    "properties" (DataFrame) and "name". Shared across reruns; do not mutate.
+    """
+    if not _is_fresh(geojson_file):
+        with _build_lock:
+            # Sessions that waited for the lock reuse the store the first one built
+            if not _is_fresh(geojson_file):
+                build_overlay_store(geojson_file)
+    return _load_overlay(geojson_file, overlay_version(geojson_file))
+
+
+if __name__ == "__main__":
+    files = sys.argv[1:] or sorted(glob.glob("enhanced_*.geojson"))
+    for geojson_file in files:
+        if not os.path.exists(geojson_file):
+            print(f"⚠️ File {geojson_file} not found, skipping...")
+            continue
+        path = build_overlay_store(geojson_file, replace=True)
+        overlay = load_overlay(geojson_file)
+        vertices = [len(overlay["coords"])] + [len(lod["coords"]) for lod in overlay["levels"]]
+        print(f"✅ {geojson_file} -> {path} ({len(overlay['geom_type'])} features, vertices per level {vertices})")
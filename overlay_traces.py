@@ -0,0 +1,147 @@
+"""
+Batched Plotly traces for the binary overlay store.
+Instead of one Scattermapbox trace per Polygon / MultiPolygon part / Point,
+an overlay is packed into at most three traces:
+    - one filled line trace holding every exterior ring, separated by gaps
+    - one marker trace at each polygon part's vertex centroid carrying its tooltip
+    - one marker trace for Point / MultiPoint features
+"""
+
+import numpy as np
+
+from overlay_store import GEOMETRY_TYPES, exterior_rings
+
+POINT_TYPES = [GEOMETRY_TYPES["Point"], GEOMETRY_TYPES["MultiPoint"]]
+
+
+def property_list(value):
+    """List-valued overlay property (districts/states) as a plain list"""
+    if value is None or isinstance(value, (str, float)):
+        return []
+    return [str(v) for v in value]
+
+
+def _location_text(props):
+    districts = property_list(props.get("districts"))
+    states = property_list(props.get("states"))
+    text = ""
+    if districts:
+        text += f"Districts: {', '.join(districts)}<br>"
+    if states:
+        text += f"States: {', '.join(states)}"
+    return text
+
+
+def packed_rings(coords, starts, ends):
+    """
+    Concatenate coords[starts[i]:ends[i]] for every ring with a NaN row after each,
+    so one trace draws all rings as separate shapes. Returns (lon, lat) arrays.
+    """
+    starts = np.asarray(starts, dtype="int64")
+    lengths = np.asarray(ends, dtype="int64") - starts
+    out_lengths = lengths + 1
+    total = int(out_lengths.sum())
+    within = np.arange(total) - np.repeat(np.cumsum(out_lengths) - out_lengths, out_lengths)
+    gap = within == np.repeat(lengths, out_lengths)
+    source = np.where(gap, 0, np.repeat(starts, out_lengths) + within)
+    packed = np.asarray(coords)[source] if len(coords) else np.empty((total, 2))
+    packed[gap] = np.nan
+    return packed[:, 0], packed[:, 1]
+
+
+def ring_centroids(coords, starts, ends):
+    """Vertex centroid (lon, lat) of every ring coords[starts[i]:ends[i]]"""
+    starts = np.asarray(starts, dtype="int64")
+    lengths = np.asarray(ends, dtype="int64") - starts
+    ring = np.repeat(np.arange(len(starts)), lengths)
+    vertex = np.repeat(starts, lengths) + np.arange(len(ring)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    points = np.asarray(coords)[vertex]
+    counts = np.maximum(lengths, 1)
+    return np.column_stack([
+        np.bincount(ring, weights=points[:, 0], minlength=len(starts)) / counts,
+        np.bincount(ring, weights=points[:, 1], minlength=len(starts)) / counts,
+    ])
+
+
+def overlay_traces(overlay, label, overlay_color, level=0, parts=None):
+    """
+    Build the batched traces for an overlay loaded by overlay_store.load_overlay.
+    Outlines are drawn from pyramid level `level`; tooltip anchors and points
+    always use full detail. parts optionally restricts drawing to a boolean
+    mask over polygon parts.
+    """
+    # plotly is only needed once a map is drawn, not by property_list users or the Crop page
+    import plotly.graph_objects as go
+
+    fill_color = overlay_color.replace("0.5", "0.2")
+    line_color = overlay_color.replace("0.5", "0.8")
+    feature_offsets = np.asarray(overlay["feature_offsets"])
+    coords, exterior_start, exterior_end = exterior_rings(overlay)
+    geom_type = np.asarray(overlay["geom_type"])
+    props = overlay["properties"].to_dict("records")
+
+    part_feature = np.repeat(np.arange(len(geom_type)), np.diff(feature_offsets))
+    part_number = np.arange(len(part_feature)) - feature_offsets[part_feature]
+    is_point = np.isin(geom_type[part_feature], POINT_TYPES)
+
+    polygon_parts = ~is_point & (exterior_end > exterior_start)
+    if parts is not None:
+        polygon_parts &= parts
+    traces = []
+
+    polygon_index = np.flatnonzero(polygon_parts)
+    if len(polygon_index):
+        level_coords, level_start, level_end = exterior_rings(overlay, level)
+        drawn = polygon_index[level_end[polygon_index] > level_start[polygon_index]]
+        lon, lat = packed_rings(level_coords, level_start[drawn], level_end[drawn])
+        traces.append(go.Scattermapbox(
+            lat=lat,
+            lon=lon,
+            fill="toself",
+            fillcolor=fill_color,
+            line=dict(color=line_color, width=2),
+            mode="lines",
+            name=label,
+            hoverinfo="skip",
+            showlegend=False
+        ))
+
+        # Tooltip anchors: vertex centroid of each exterior ring
+        centroids = ring_centroids(coords, exterior_start[polygon_index], exterior_end[polygon_index])
+        tooltips = []
+        for part in polygon_index:
+            feature = part_feature[part]
+            location = _location_text(props[feature])
+            if geom_type[feature] == GEOMETRY_TYPES["MultiPolygon"]:
+                tooltips.append(f"<b>MultiPolygon Part {part_number[part] + 1}</b><br>"
+                                + (location or "Location data unavailable"))
+            elif location:
+                tooltips.append(f"<b>Polygon Information</b><br>{location}")
+            else:
+                tooltips.append("Polygon area (location data unavailable)")
+        traces.append(go.Scattermapbox(
+            lat=centroids[:, 1],
+            lon=centroids[:, 0],
+            mode="markers",
+            marker=dict(size=6, color=line_color),
+            name=label,
+            hovertext=tooltips,
+            hoverinfo="text",
+            showlegend=False
+        ))
+
+    point_index = np.flatnonzero(is_point)
+    if len(point_index):
+        vertices = np.asarray(coords)[exterior_start[point_index]]
+        tooltips = [_location_text(props[part_feature[part]]) or "Location data unavailable"
+                    for part in point_index]
+        traces.append(go.Scattermapbox(
+            lat=vertices[:, 1],
+            lon=vertices[:, 0],
+            mode="markers",
+            marker=dict(size=8, color=overlay_color),
+            name=f"GeoJSON Points ({label})",
+            hovertext=tooltips,
+            hoverinfo="text"
+        ))
+    return traces
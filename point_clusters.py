@@ -0,0 +1,66 @@
+"""
+Server-side grid clustering of dense point sources for low map zooms.
+For every zoom level below CLUSTER_MAX_ZOOM each site is assigned to a square
+Web Mercator cell about CLUSTER_RADIUS_PX screen pixels wide. Cells halve at
+each zoom, so the levels nest like a quadtree. The cell keys are computed once
+per dataset version; a rerun only groups the currently filtered rows by their
+precomputed key, so the map receives one marker per occupied cell (with its
+count) instead of every site, and individual sites from CLUSTER_MAX_ZOOM on.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from dataset_registry import dataset_version, load_dataset
+
+CLUSTER_MIN_ZOOM = 0
+CLUSTER_MAX_ZOOM = 10
+CLUSTER_RADIUS_PX = 40
+TILE_SIZE_PX = 256
+
+
+def _mercator(lon, lat):
+    """Web Mercator x, y in [0, 1) for lon/lat in degrees"""
+    lat = np.clip(np.asarray(lat, dtype="float64"), -85.05112878, 85.05112878)
+    x = (np.asarray(lon, dtype="float64") + 180) / 360
+    y = (1 - np.log(np.tan(np.radians(lat)) + 1 / np.cos(np.radians(lat))) / np.pi) / 2
+    return np.clip(x, 0, np.nextafter(1, 0)), np.clip(y, 0, np.nextafter(1, 0))
+
+
+@lru_cache(maxsize=8)
+def _cluster_levels(source, version):
+    points = load_dataset(source)
+    x, y = _mercator(points["longitude"], points["latitude"])
+    levels = {}
+    for zoom in range(CLUSTER_MIN_ZOOM, CLUSTER_MAX_ZOOM):
+        cells = max(1, int(2 ** zoom * TILE_SIZE_PX / CLUSTER_RADIUS_PX))
+        levels[zoom] = (np.floor(y * cells).astype("int64") * cells + np.floor(x * cells).astype("int64"))
+    return levels
+
+
+def cluster_levels(source):
+    """{zoom: int64 cell key per row of load_dataset(source)}, cached per dataset version"""
+    return _cluster_levels(source, dataset_version(source))
+
+
+def cluster_points(df, source, zoom):
+    """
+    Group the rows of df (a slice of the source's hot frame, with row_id) into
+    the cells of a zoom level. Returns (singles, clusters): the rows of df that
+    are alone in their cell, and a frame of multi-site cells with
+    latitude/longitude (mean position) and count. Above CLUSTER_MAX_ZOOM
+    everything is a single.
+    """
+    zoom = int(zoom)
+    if zoom >= CLUSTER_MAX_ZOOM or df.empty:
+        return df, pd.DataFrame(columns=["latitude", "longitude", "count"])
+    keys = cluster_levels(source)[max(zoom, CLUSTER_MIN_ZOOM)][df["row_id"].to_numpy()]
+    _, cell, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    alone = counts[cell] == 1
+    lat = np.bincount(cell, weights=df["latitude"].to_numpy(dtype="float64")) / counts
+    lon = np.bincount(cell, weights=df["longitude"].to_numpy(dtype="float64")) / counts
+    grouped = counts > 1
+    clusters = pd.DataFrame({"latitude": lat[grouped], "longitude": lon[grouped], "count": counts[grouped]})
+    return df[alone], clusters
@@ -0,0 +1,52 @@
+"""
+Memoized dashboard filters over the shared canonical points frame.
+A filter is resolved to the positions of the matching rows in
+dataset_registry.load_points() by combining boolean masks over its columns
+(plus the ranked name index for a query), without copying the frame step by
+step. The read-only row positions live in a bounded process-wide LRU keyed by
+(dataset version, sources, name query, states, districts), so every session
+and every back-and-forth filter change reuses them; the rows themselves are
+taken from the shared frame per call, so a cached entry costs a few bytes per
+row rather than a copy of the frame.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from dataset_registry import load_points, points_version
+from name_index import search_names
+
+FILTER_CACHE_SIZE = 128
+
+
+def _key(values):
+    return tuple(sorted(str(v) for v in values or ()))
+
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def _filter(sites_version, sources, query, states, districts):
+    points = load_points()
+    mask = points["source_type"].isin(sources).to_numpy()
+    if states:
+        mask = mask & points["state"].isin(states).to_numpy()
+    if districts:
+        mask = mask & points["district"].isin(districts).to_numpy()
+    if query:
+        # Keep the name index ranking (best match first)
+        matches, _ = search_names(query)
+        rows = matches[mask[matches]]
+    else:
+        rows = np.flatnonzero(mask)
+    rows.flags.writeable = False
+    return rows
+
+
+def filter_rows(sources, query="", states=(), districts=()):
+    """Read-only positions in load_points() of the rows passing the filters (ranked by name match if querying)"""
+    return _filter(points_version(), _key(sources), query.strip().lower(), _key(states), _key(districts))
+
+
+def filter_points(sources, query="", states=(), districts=()):
+    """The rows of load_points() passing the filters, indexed like load_points() (a new frame per call)"""
+    return load_points().take(filter_rows(sources, query, states, districts))
@@ -3,65 +3,56 @@
 Pre-process GeoJSON files to map polygons to districts and states.
 This script calculates all spatial intersections beforehand and saves the results
 so the Streamlit app can load them quickly without real-time calculations.
+
+    python preprocess_geojson_mappings.py --workers 0   # one worker process per CPU
+
+Each layer gets a mapping_<layer>.manifest.json holding the spatial join result
+per geometry hash and the boundary files' version, so a re-run only recomputes
+new or changed features. Layers whose file and output settings (the fallback
+rules and --precision) have not changed since the last run are skipped altogether.
+Layers and mapping_*.json are streamed through geojson_stream in compact form;
+the default sequential mode keeps only STREAM_CHUNK_SIZE features in memory,
+while --workers holds the layers being processed in memory.
 """
 
+import argparse
+import hashlib
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 import geopandas as gpd
+import numpy as np
+import shapely
 from shapely.geometry import shape
 import pandas as pd
 from tqdm import tqdm
 
+from aggregation_cube import CUBE_FILE, build_cube
+from boundary_store import DISTRICTS_FILE, STATES_FILE, boundaries_available, boundary_frame, boundary_version
+from geojson_stream import iter_features, trim_precision, write_feature_collection, write_mapping
+from region_rules import centroid_regions, ruleset_version
+from reverse_geocoder import geocode_sources, load_geocoder
+
+# Features per task handed to a worker process in parallel mode
+CHUNK_SIZE = 200
+# Features read, mapped and written at a time by the sequential (bounded-memory) mode
+STREAM_CHUNK_SIZE = 5000
+# Bump when the manifest layout changes; older manifests are then ignored
+MANIFEST_FORMAT = 1
+# Boundaries rebuilt in each worker process by _init_worker
+_worker_boundaries = None
+
 def load_boundaries():
-    """Load India administrative boundaries"""
+    """Load India administrative boundaries from the compiled boundary store (boundary_store.py)"""
     try:
-        states_file = "india_states.geojson"
-        districts_file = "india_districts.geojson"
-        
-        if not os.path.exists(states_file) or not os.path.exists(districts_file):
-            print("❌ Boundary files not found. Please ensure india_states.geojson and india_districts.geojson exist.")
+        if not boundaries_available():
+            print(f"❌ Boundary files not found. Please ensure {STATES_FILE} and {DISTRICTS_FILE} exist.")
             return gpd.GeoDataFrame()
-            
-        # Load boundaries
-        states_gdf = gpd.read_file(states_file)
-        districts_gdf = gpd.read_file(districts_file)
-        
-        # Combine and standardize
-        states_gdf['boundary_type'] = 'state'
-        districts_gdf['boundary_type'] = 'district'
-        
-        # Standardize column names
-        if 'NAME_1' in states_gdf.columns:
-            states_gdf['name'] = states_gdf['NAME_1']
-        elif 'ST_NM' in states_gdf.columns:
-            states_gdf['name'] = states_gdf['ST_NM']
-        elif 'state' in states_gdf.columns:
-            states_gdf['name'] = states_gdf['state']
-            
-        if 'NAME_2' in districts_gdf.columns:
-            districts_gdf['name'] = districts_gdf['NAME_2']
-        elif 'DISTRICT' in districts_gdf.columns:
-            districts_gdf['name'] = districts_gdf['DISTRICT']
-        elif 'district' in districts_gdf.columns:
-            districts_gdf['name'] = districts_gdf['district']
-            
-        # Add state info to districts
-        if 'NAME_1' in districts_gdf.columns:
-            districts_gdf['state_name'] = districts_gdf['NAME_1']
-        elif 'ST_NM' in districts_gdf.columns:
-            districts_gdf['state_name'] = districts_gdf['ST_NM']
-            
-        # Select needed columns and combine
-        states_clean = states_gdf[['name', 'boundary_type', 'geometry']].copy()
-        districts_clean = districts_gdf[['name', 'boundary_type', 'geometry']].copy()
-        if 'state_name' in districts_gdf.columns:
-            districts_clean['state_name'] = districts_gdf['state_name']
-        
-        # Combine both GeoDataFrames
-        combined_boundaries = pd.concat([states_clean, districts_clean], ignore_index=True)
-        combined_gdf = gpd.GeoDataFrame(combined_boundaries)
         
-        print(f"✅ Loaded {len(states_gdf)} states and {len(districts_gdf)} districts")
+        combined_gdf = boundary_frame()
+        counts = combined_gdf['boundary_type'].value_counts()
+        print(f"✅ Loaded {counts.get('state', 0)} states and {counts.get('district', 0)} districts")
         return combined_gdf
         
     except Exception as e:
@@ -70,84 +61,256 @@ def load_boundaries():
 
 def get_intersected_regions(polygon, boundaries):
     """Get districts and states that intersect with polygon"""
+    return get_intersected_regions_bulk([polygon], boundaries)[0]
+
+def get_intersected_regions_bulk(polygons, boundaries, filename=None):
+    """
+    Districts and states intersecting each of many polygons, from one spatial
+    index join against the boundaries followed by a group-by per feature.
+    Returns a list of (districts, states) in the order of polygons; when the
+    join fails on bad geometry they are all empty (coordinate fallback) and
+    the failure is reported for filename.
+    """
+    regions = [([], []) for _ in polygons]
     try:
-        if boundaries.empty:
-            return [], []
-            
-        # Ensure polygon is GeoDataFrame with correct CRS
-        polygon_gdf = gpd.GeoDataFrame(geometry=[polygon], crs="EPSG:4326")
-        
-        # Ensure boundaries have same CRS
-        if boundaries.crs != "EPSG:4326":
+        if boundaries.empty or not len(polygons):
+            return regions
+        if boundaries.crs is not None and boundaries.crs != "EPSG:4326":
             boundaries = boundaries.to_crs("EPSG:4326")
-        
-        # Perform spatial intersection
-        intersection = gpd.overlay(boundaries, polygon_gdf, how='intersection')
-        
-        districts = []
-        states = []
-        
-        if not intersection.empty:
-            # Get districts
-            district_rows = intersection[intersection['boundary_type'] == 'district']
-            if not district_rows.empty and 'name' in district_rows.columns:
-                districts = district_rows['name'].dropna().unique().tolist()
+        boundaries = boundaries.reset_index(drop=True)
+
+        features = gpd.GeoDataFrame({"feature": np.arange(len(polygons))}, geometry=list(polygons), crs=boundaries.crs)
+        joined = gpd.sjoin(features, boundaries, how="inner", predicate="intersects")
+        # Like gpd.overlay, a polygon only counts boundaries it shares area with, not ones
+        # it merely touches; exact areas are needed only where a boundary does not contain it
+        shapes = joined.geometry.values
+        regions_hit = boundaries.geometry.values[joined["index_right"].to_numpy()]
+        areal = np.isin(shapely.get_type_id(shapes), [3, 6])  # Polygon, MultiPolygon
+        check = areal & ~shapely.contains_properly(regions_hit, shapes)
+        keep = np.ones(len(joined), dtype=bool)
+        keep[check] = shapely.area(shapely.intersection(shapes[check], regions_hit[check])) > 0
+        joined = joined[keep].sort_values(["feature", "index_right"])
+
+        named = joined.dropna(subset=["name"])
+        districts = named[named["boundary_type"] == "district"].groupby("feature")["name"].unique()
+        states = named[named["boundary_type"] == "state"].groupby("feature")["name"].unique()
+        # If no states found directly, take them from the districts' state_name
+        if "state_name" in joined.columns:
+            district_states = (joined[joined["boundary_type"] == "district"].dropna(subset=["state_name"])
+                               .groupby("feature")["state_name"].unique())
+            states = states.combine_first(district_states)
+
+        for feature, names in districts.items():
+            regions[feature] = (names.tolist(), regions[feature][1])
+        for feature, names in states.items():
+            regions[feature] = (regions[feature][0], names.tolist())
+        return regions
+
+    except (shapely.errors.ShapelyError, ValueError) as e:
+        print(f"⚠️ Spatial join failed for {len(polygons)} features of {filename or 'a layer'}, "
+              f"using the coordinate fallback for them: {type(e).__name__}: {e}")
+        return regions
+
+def get_coordinate_fallback(polygon):
+    """Fallback coordinate-based estimation (the "fallback" rules in region_rules.json)"""
+    regions = centroid_regions([polygon], "fallback")
+    return list(regions.at[0, "districts"]), list(regions.at[0, "states"])
+
+def valid_features(filename, progress=True, precision=None):
+    """
+    Stream (feature_id, feature, polygon) for the features of a GeoJSON file
+    that have a usable geometry; feature_id is the feature's position in the
+    file. With precision, coordinates are rounded to that many decimals unless
+    that would make the geometry invalid.
+    """
+    # Parse each feature with progress bar
+    for i, feature in enumerate(tqdm(iter_features(filename), desc=f"Processing {filename}", disable=not progress)):
+        try:
+            geometry = feature.get('geometry', {})
+            if not geometry or not geometry.get('coordinates'):
+                continue
+            
+            # Convert to shapely polygon
+            polygon = shape(geometry)
+            
+            if polygon.is_empty or not polygon.is_valid:
+                continue
+            
+            if precision is not None:
+                # Keep the full coordinates of geometries that rounding would make invalid
+                trimmed = trim_precision(geometry, precision)
+                trimmed_polygon = shape(trimmed)
+                if trimmed_polygon.is_valid and not trimmed_polygon.is_empty:
+                    feature['geometry'], polygon = trimmed, trimmed_polygon
             
-            # Get states
-            state_rows = intersection[intersection['boundary_type'] == 'state']
-            if not state_rows.empty and 'name' in state_rows.columns:
-                states = state_rows['name'].dropna().unique().tolist()
+            yield i, feature, polygon
             
-            # If no states found directly, try from district's state_name
-            if not states and not district_rows.empty and 'state_name' in district_rows.columns:
-                states = district_rows['state_name'].dropna().unique().tolist()
+        except Exception as e:
+            print(f"⚠️ Error processing feature {i} in {filename}: {e}")
+            continue
+
+def read_features(filename, progress=True, precision=None):
+    """
+    Parse the features of a GeoJSON file that have a usable geometry.
+    Returns (features, polygons, feature_ids) where feature_ids are the
+    positions of the kept features in the original file.
+    """
+    processed_features, polygons, feature_ids = [], [], []
+    for i, feature, polygon in valid_features(filename, progress, precision):
+        processed_features.append(feature)
+        polygons.append(polygon)
+        feature_ids.append(i)
+    return processed_features, polygons, feature_ids
+
+def apply_regions(processed_features, polygons, feature_ids, regions):
+    """Attach the (districts, states) of each feature and fill gaps by coordinates"""
+    fallback_features, fallback_polygons = [], []
+    for position, (feature, (districts, states)) in enumerate(zip(processed_features, regions)):
+        method = "spatial_intersection"
+        # Fallback if intersection fails (empty): resolved below for all such features at once
+        if not districts and not states:
+            fallback_features.append(position)
+            fallback_polygons.append(polygons[position])
+            method = "coordinate_estimation"
         
-        return districts, states
+        # Add mapping to feature properties
+        if 'properties' not in feature:
+            feature['properties'] = {}
         
-    except Exception as e:
-        print(f"⚠️ Spatial intersection failed: {e}")
-        return [], []
+        feature['properties']['districts'] = districts
+        feature['properties']['states'] = states
+        feature['properties']['mapping_method'] = method
+        feature['properties']['feature_id'] = feature_ids[position]
+    
+    # Coordinate fallback for every feature without a boundary intersection in one batch
+    if fallback_polygons:
+        fallback = centroid_regions(fallback_polygons, "fallback")
+        for position, districts, states in zip(fallback_features, fallback["districts"], fallback["states"]):
+            processed_features[position]['properties']['districts'] = list(districts)
+            processed_features[position]['properties']['states'] = list(states)
 
-def get_coordinate_fallback(polygon):
-    """Fallback coordinate-based estimation"""
+def mapping_summary_file(filename):
+    return f"mapping_{filename.replace('.geojson', '.json')}"
+
+def write_layer(filename, processed_features):
+    """
+    Stream the enhanced features (any iterable) over filename and their
+    summary to mapping_*.json, both compact
+    """
+    summary = []
+    
+    def summarized():
+        for feature in processed_features:
+            props = feature.get('properties', {})
+            summary.append({
+                'districts': props.get('districts', []),
+                'states': props.get('states', []),
+                'method': props.get('mapping_method', 'unknown')
+            })
+            yield feature
+    
+    # Save enhanced GeoJSON (overwrite original with enhanced version)
+    count = write_feature_collection(filename, summarized())
+    print(f"✅ Enhanced {filename} with {count} features (original file updated)")
+    
+    # Create summary mapping file
+    summary_filename = mapping_summary_file(filename)
+    write_mapping(summary_filename, enumerate(summary))
+    print(f"✅ Saved mapping summary to {summary_filename}")
+
+def manifest_file(filename):
+    """Manifest written next to a layer's mapping_*.json"""
+    return f"mapping_{filename.replace('.geojson', '.manifest.json')}"
+
+def geometry_hashes(polygons):
+    """Content hash of each geometry's WKB, stable across runs"""
+    return [hashlib.blake2b(wkb, digest_size=16).hexdigest() for wkb in shapely.to_wkb(list(polygons))]
+
+def _file_key(filename):
+    stat = os.stat(filename)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def output_version(precision=None):
+    """Version of the inputs besides geometries and boundaries that shape a layer's written output"""
+    return {"fallback_rules": ruleset_version("fallback"), "precision": precision}
+
+def read_manifest(filename):
+    """A layer's manifest, or None if missing or computed against other boundaries"""
     try:
-        centroid = polygon.centroid
-        lat, lon = centroid.y, centroid.x
-        
-        # Simplified coordinate mapping for major states
-        if 24.0 <= lat <= 30.2 and 69.5 <= lon <= 78.2:
-            return ["Jodhpur", "Jaipur", "Bikaner"], ["Rajasthan"]
-        elif 20.1 <= lat <= 24.7 and 68.2 <= lon <= 74.5:
-            return ["Ahmedabad", "Rajkot", "Surat"], ["Gujarat"]
-        elif 15.6 <= lat <= 22.0 and 72.6 <= lon <= 80.9:
-            return ["Mumbai", "Pune", "Nagpur"], ["Maharashtra"]
-        elif 11.5 <= lat <= 18.5 and 74.0 <= lon <= 78.6:
-            return ["Bangalore", "Mysore", "Belgaum"], ["Karnataka"]
-        elif 8.1 <= lat <= 13.6 and 76.2 <= lon <= 80.3:
-            return ["Chennai", "Coimbatore", "Madurai"], ["Tamil Nadu"]
-        elif 12.6 <= lat <= 19.9 and 76.8 <= lon <= 84.8:
-            return ["Hyderabad", "Visakhapatnam"], ["Telangana", "Andhra Pradesh"]
-        elif 8.2 <= lat <= 12.8 and 74.9 <= lon <= 77.4:
-            return ["Kochi", "Thiruvananthapuram"], ["Kerala"]
-        elif 21.5 <= lat <= 27.1 and 85.8 <= lon <= 89.9:
-            return ["Kolkata", "Darjeeling"], ["West Bengal"]
-        elif 17.8 <= lat <= 22.6 and 81.4 <= lon <= 87.5:
-            return ["Bhubaneswar", "Cuttack"], ["Odisha"]
-        elif 21.1 <= lat <= 26.9 and 74.0 <= lon <= 82.8:
-            return ["Bhopal", "Indore", "Jabalpur"], ["Madhya Pradesh"]
-        elif 23.9 <= lat <= 30.4 and 77.1 <= lon <= 84.6:
-            return ["Lucknow", "Agra", "Varanasi"], ["Uttar Pradesh"]
-        elif 29.5 <= lat <= 32.5 and 73.9 <= lon <= 76.9:
-            return ["Amritsar", "Ludhiana"], ["Punjab"]
-        elif 27.7 <= lat <= 30.9 and 74.5 <= lon <= 77.6:
-            return ["Gurugram", "Faridabad"], ["Haryana"]
-        else:
-            return ["Unknown District"], ["Unknown State"]
-    except:
-        return ["Unknown District"], ["Unknown State"]
+        with open(manifest_file(filename), 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != MANIFEST_FORMAT or manifest.get("boundary_version") != boundary_version():
+        return None
+    return manifest
 
-def process_geojson_file(filename, boundaries):
-    """Process a single GeoJSON file and add district/state mappings"""
+def write_manifest(filename, hashes, regions, precision=None):
+    """Record the spatial join result per geometry hash and the version of the file just written"""
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "boundary_version": boundary_version(),
+        "source": _file_key(filename),
+        "outputs": output_version(precision),
+        "features": {h: [districts, states] for h, (districts, states) in zip(hashes, regions)},
+    }
+    with open(manifest_file(filename), 'w') as f:
+        json.dump(manifest, f, separators=(",", ":"))
+
+def check_manifest(filename, boundaries, force=False, precision=None):
+    """
+    (manifest to reuse or None, whether the layer is unchanged since the run
+    that wrote it). A layer written with other fallback rules or coordinate
+    precision is rewritten, reusing its features' spatial join results where
+    their geometry hash still matches.
+    """
+    manifest = None if force or boundaries.empty else read_manifest(filename)
+    unchanged = (manifest is not None and manifest.get("source") == _file_key(filename)
+                 and manifest.get("outputs") == output_version(precision)
+                 and os.path.exists(mapping_summary_file(filename)))
+    return manifest, unchanged
+
+def _reuse(manifest, hashes):
+    """Regions the manifest holds for each hash (None where still to compute) and the positions to compute"""
+    known = manifest["features"] if manifest is not None else {}
+    regions = [tuple(known[h]) if h in known else None for h in hashes]
+    return regions, [position for position, found in enumerate(regions) if found is None]
+
+def _report_reuse(total, computed):
+    if computed < total:
+        print(f"♻️ Reusing mappings of {total - computed} unchanged features, computing {computed}")
+
+def plan_file(filename, boundaries, force=False, progress=True, precision=None):
+    """
+    Parse a layer and reuse the regions its manifest holds for unchanged geometries.
+    Returns None when the layer has not changed since its last run, otherwise a
+    dict of features, polygons, feature_ids, hashes, regions (None where still
+    to compute) and todo (the positions to compute).
+    """
+    manifest, unchanged = check_manifest(filename, boundaries, force, precision)
+    if unchanged:
+        return None
+    
+    features, polygons, feature_ids = read_features(filename, progress, precision)
+    hashes = geometry_hashes(polygons)
+    regions, todo = _reuse(manifest, hashes)
+    _report_reuse(len(regions), len(todo))
+    return {"filename": filename, "features": features, "polygons": polygons, "feature_ids": feature_ids,
+            "hashes": hashes, "regions": regions, "todo": todo, "precision": precision}
+
+def save_file(plan, boundaries):
+    """Write the enhanced layer, its mapping summary and (with boundaries) its manifest"""
+    apply_regions(plan["features"], plan["polygons"], plan["feature_ids"], plan["regions"])
+    write_layer(plan["filename"], plan["features"])
+    if not boundaries.empty:
+        write_manifest(plan["filename"], plan["hashes"], plan["regions"], plan["precision"])
+
+def process_geojson_file(filename, boundaries, force=False, precision=None):
+    """
+    Process a single GeoJSON file and add district/state mappings.
+    Features are read, mapped and written back STREAM_CHUNK_SIZE at a time, so
+    memory stays bounded however large the layer is.
+    """
     try:
         print(f"\n🔄 Processing {filename}...")
         
@@ -155,83 +318,115 @@ def process_geojson_file(filename, boundaries):
             print(f"❌ File {filename} not found, skipping...")
             return
         
-        # Load GeoJSON
-        with open(filename, 'r') as f:
-            geojson_data = json.load(f)
-        
-        processed_features = []
-        total_features = len(geojson_data['features'])
-        
-        # Process each feature with progress bar
-        for i, feature in enumerate(tqdm(geojson_data['features'], desc=f"Processing {filename}")):
-            try:
-                geometry = feature.get('geometry', {})
-                if not geometry or not geometry.get('coordinates'):
-                    continue
-                
-                # Convert to shapely polygon
-                polygon = shape(geometry)
-                
-                if polygon.is_empty or not polygon.is_valid:
-                    continue
-                
-                # Get districts and states
-                districts, states = [], []
-                method = "spatial_intersection"
-                if not boundaries.empty:
-                    districts, states = get_intersected_regions(polygon, boundaries)
-                # Fallback if intersection fails (empty)
-                if not districts and not states:
-                    districts, states = get_coordinate_fallback(polygon)
-                    method = "coordinate_estimation"
-                
-                # Add mapping to feature properties
-                if 'properties' not in feature:
-                    feature['properties'] = {}
-                
-                feature['properties']['districts'] = districts
-                feature['properties']['states'] = states
-                feature['properties']['mapping_method'] = method
-                feature['properties']['feature_id'] = i
-                
-                processed_features.append(feature)
-                
-            except Exception as e:
-                print(f"⚠️ Error processing feature {i} in {filename}: {e}")
-                continue
-        
-        # Save enhanced GeoJSON (overwrite original with enhanced version)
-        enhanced_geojson = {
-            "type": "FeatureCollection",
-            "features": processed_features
-        }
-        
-        with open(filename, 'w') as f:
-            json.dump(enhanced_geojson, f, indent=2)
-        
-        print(f"✅ Enhanced {filename} with {len(processed_features)} features (original file updated)")
+        manifest, unchanged = check_manifest(filename, boundaries, force, precision)
+        if unchanged:
+            print(f"⏭️ {filename} unchanged since the last run, skipping")
+            return
         
-        # Create summary mapping file
-        summary = {}
-        for i, feature in enumerate(processed_features):
-            props = feature.get('properties', {})
-            summary[i] = {
-                'districts': props.get('districts', []),
-                'states': props.get('states', []),
-                'method': props.get('mapping_method', 'unknown')
-            }
+        hashes, regions, computed = [], [], []
         
-        summary_filename = f"mapping_{filename.replace('.geojson', '.json')}"
-        with open(summary_filename, 'w') as f:
-            json.dump(summary, f, indent=2)
+        def enhanced():
+            features = valid_features(filename, precision=precision)
+            while True:
+                chunk = list(islice(features, STREAM_CHUNK_SIZE))
+                if not chunk:
+                    return
+                feature_ids, processed_features, polygons = (list(column) for column in zip(*chunk))
+                chunk_hashes = geometry_hashes(polygons)
+                chunk_regions, todo = _reuse(manifest, chunk_hashes)
+                # Get districts and states of the chunk's new or changed features with one spatial join
+                found = get_intersected_regions_bulk([polygons[i] for i in todo], boundaries, filename)
+                for position, found_regions in zip(todo, found):
+                    chunk_regions[position] = found_regions
+                apply_regions(processed_features, polygons, feature_ids, chunk_regions)
+                hashes.extend(chunk_hashes)
+                regions.extend(chunk_regions)
+                computed.extend(todo)
+                yield from processed_features
         
-        print(f"✅ Saved mapping summary to {summary_filename}")
+        write_layer(filename, enhanced())
+        _report_reuse(len(regions), len(computed))
+        if not boundaries.empty:
+            write_manifest(filename, hashes, regions, precision)
         
     except Exception as e:
         print(f"❌ Error processing {filename}: {e}")
 
+def _pack_boundaries(boundaries):
+    """Boundaries as a WKB buffer plus plain attribute columns, cheap to hand to worker processes"""
+    return {
+        "wkb": shapely.to_wkb(boundaries.geometry.values),
+        "attributes": pd.DataFrame(boundaries.drop(columns=boundaries.geometry.name)),
+        "crs": boundaries.crs,
+    }
+
+def _init_worker(packed):
+    """Pool initializer: rebuild the boundaries once per worker"""
+    global _worker_boundaries
+    _worker_boundaries = gpd.GeoDataFrame(packed["attributes"], geometry=shapely.from_wkb(packed["wkb"]),
+                                          crs=packed["crs"])
+
+def _map_chunk(task):
+    """Worker task: (plan index, feature positions, polygons, filename) -> plan index, positions and their regions"""
+    plan_index, positions, polygons, filename = task
+    return plan_index, positions, get_intersected_regions_bulk(polygons, _worker_boundaries, filename)
+
+def process_geojson_files(filenames, boundaries, workers=1, force=False, precision=None):
+    """
+    Process several GeoJSON files. With more than one worker, the new or changed
+    features of every file are cut into CHUNK_SIZE chunks that a process pool
+    maps against the boundaries (shipped once per worker as WKB). Chunk results
+    are put back by position, so the outputs are identical for any number of workers.
+    """
+    if workers <= 1 or boundaries.empty:
+        for filename in filenames:
+            process_geojson_file(filename, boundaries, force, precision)
+        return
+    
+    print(f"\n🔄 Processing {len(filenames)} files with {workers} workers...")
+    plans = []
+    for filename in filenames:
+        try:
+            plan = plan_file(filename, boundaries, force, progress=False, precision=precision)
+        except Exception as e:
+            print(f"❌ Error processing {filename}: {e}")
+            continue
+        if plan is None:
+            print(f"⏭️ {filename} unchanged since the last run, skipping")
+        else:
+            plans.append(plan)
+    
+    tasks = []
+    for plan_index, plan in enumerate(plans):
+        for start in range(0, len(plan["todo"]), CHUNK_SIZE):
+            positions = plan["todo"][start:start + CHUNK_SIZE]
+            tasks.append((plan_index, positions, [plan["polygons"][i] for i in positions], plan["filename"]))
+    if tasks:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(_pack_boundaries(boundaries),)) as pool, \
+                tqdm(total=sum(len(plan["todo"]) for plan in plans), desc="Mapping features") as progress:
+            for plan_index, positions, found in pool.map(_map_chunk, tasks):
+                for position, regions in zip(positions, found):
+                    plans[plan_index]["regions"][position] = regions
+                progress.update(len(positions))
+    
+    for plan in plans:
+        try:
+            save_file(plan, boundaries)
+        except Exception as e:
+            print(f"❌ Error processing {plan['filename']}: {e}")
+
 def main():
     """Main preprocessing function"""
+    parser = argparse.ArgumentParser(description="Precompute district/state mappings of the GeoJSON layers")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes for the spatial join (0 = one per CPU, 1 = no pool)")
+    parser.add_argument("--force", action="store_true",
+                        help="Recompute every feature instead of reusing the mapping_*.manifest.json entries")
+    parser.add_argument("--precision", type=int, default=None,
+                        help="Round layer coordinates to this many decimals when rewriting them (6 = ~0.1 m)")
+    args = parser.parse_args()
+    
     print("🚀 Starting GeoJSON preprocessing for fast Streamlit loading...")
     
     # Load boundaries
@@ -251,11 +446,26 @@ def main():
     ]
     
     # Process each file
+    existing_files = []
     for filename in geojson_files:
         if os.path.exists(filename):
-            process_geojson_file(filename, boundaries)
+            existing_files.append(filename)
         else:
             print(f"⚠️ File {filename} not found, skipping...")
+    process_geojson_files(existing_files, boundaries, args.workers or os.cpu_count(), args.force, args.precision)
+    
+    # Reverse geocode the point sources against the same boundaries
+    if not boundaries.empty:
+        print("\n📍 Reverse geocoding point sources...")
+        geocode_sources(load_geocoder())
+
+    # The dashboard summaries read the aggregation cube but never build it on a request
+    print("\n🧮 Building the aggregation cube...")
+    try:
+        cube = build_cube()
+        print(f"   ✅ {CUBE_FILE} ({len(cube)} rows)")
+    except OSError as e:
+        print(f"⚠️ Aggregation cube not built, the dashboard summarises the raw rows instead: {e}")
     
     print("\n🎉 Preprocessing complete! Original GeoJSON files enhanced with district/state data.")
     print("📝 Files updated:")
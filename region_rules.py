@@ -0,0 +1,101 @@
+"""
+Table-driven lat/lon box rules for estimating districts and states of points
+or polygon centroids, replacing the hand-written if/elif chains.
+The boxes live in region_rules.json, one rule set per use:
+    detailed   dashboard estimate (state boxes with city sub-boxes)
+    fallback   coarse state boxes for preprocessing when no boundary intersects
+Each rule is a closed box {"lat": [min, max], "lon": [min, max]} with the
+districts/states it stands for; "sub" rules refine it and the rule's own
+districts/states apply when no sub rule matches. Rules are tried in order and
+the first match wins.
+
+For lookup the nested rules are flattened once into ordered box arrays (each
+sub box clipped to its parent, followed by the parent box itself), so that
+"first matching row" gives the same answer as the nested chain and whole
+arrays of points are classified with a few NumPy comparisons.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import shapely
+
+RULES_FILE = "region_rules.json"
+# Rows classified per block (bounds the n_points x n_rules match matrix)
+BLOCK_SIZE = 65536
+
+
+def ruleset_version(ruleset):
+    """Content hash of one rule set in RULES_FILE; changes whenever its rules do"""
+    with open(RULES_FILE, "r") as f:
+        spec = json.load(f)[ruleset]
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def load_rules(ruleset):
+    """Flattened rule table of a rule set: DataFrame with name, box bounds, districts, states"""
+    with open(RULES_FILE, "r") as f:
+        spec = json.load(f)[ruleset]
+
+    rows = []
+    for rule in spec["rules"]:
+        for sub in rule.get("sub", []):
+            rows.append({
+                "name": sub["name"],
+                "lat_min": max(rule["lat"][0], sub["lat"][0]), "lat_max": min(rule["lat"][1], sub["lat"][1]),
+                "lon_min": max(rule["lon"][0], sub["lon"][0]), "lon_max": min(rule["lon"][1], sub["lon"][1]),
+                "districts": sub["districts"], "states": sub.get("states", rule["states"]),
+            })
+        rows.append({
+            "name": rule["name"],
+            "lat_min": rule["lat"][0], "lat_max": rule["lat"][1],
+            "lon_min": rule["lon"][0], "lon_max": rule["lon"][1],
+            "districts": rule["districts"], "states": rule["states"],
+        })
+    default = spec["default"]
+    rows.append({"name": default["name"], "lat_min": np.nan, "lat_max": np.nan, "lon_min": np.nan, "lon_max": np.nan,
+                 "districts": default["districts"], "states": default["states"]})
+    return pd.DataFrame(rows)
+
+
+def match_rules(lon, lat, ruleset="detailed"):
+    """
+    Index into load_rules(ruleset) of the first rule matching each point;
+    points matching no box (or with NaN coordinates) get the default row.
+    """
+    rules = load_rules(ruleset)
+    boxes = rules.iloc[:-1]
+    lat_min, lat_max = boxes["lat_min"].to_numpy()[None], boxes["lat_max"].to_numpy()[None]
+    lon_min, lon_max = boxes["lon_min"].to_numpy()[None], boxes["lon_max"].to_numpy()[None]
+    lon = np.asarray(lon, dtype="float64").ravel()
+    lat = np.asarray(lat, dtype="float64").ravel()
+
+    matched = np.full(len(lon), len(rules) - 1, dtype="int64")
+    for start in range(0, len(lon), BLOCK_SIZE):
+        block_lat = lat[start:start + BLOCK_SIZE, None]
+        block_lon = lon[start:start + BLOCK_SIZE, None]
+        inside = (lat_min <= block_lat) & (block_lat <= lat_max) & (lon_min <= block_lon) & (block_lon <= lon_max)
+        hit = inside.any(axis=1)
+        matched[start:start + BLOCK_SIZE][hit] = inside[hit].argmax(axis=1)
+    return matched
+
+
+def lookup_regions(lon, lat, ruleset="detailed"):
+    """Batch lookup: one row per point with the matched rule name, districts and states"""
+    rules = load_rules(ruleset)
+    matched = match_rules(lon, lat, ruleset)
+    return pd.DataFrame({
+        "rule": rules["name"].to_numpy()[matched],
+        "districts": rules["districts"].to_numpy()[matched],
+        "states": rules["states"].to_numpy()[matched],
+    })
+
+
+def centroid_regions(geometries, ruleset="detailed"):
+    """lookup_regions for the centroids of an array of shapely geometries"""
+    centroids = shapely.centroid(np.asarray(geometries, dtype=object))
+    return lookup_regions(shapely.get_x(centroids), shapely.get_y(centroids), ruleset)
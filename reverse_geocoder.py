@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Batch reverse geocoder: state and district for whole arrays of points.
+The state and district polygons of the compiled boundary store
+(boundary_store.py, built from india_states.geojson / india_districts.geojson)
+are prepared and looked up through the store's grid index, so a
+point-in-polygon lookup for every site is one bulk candidate query plus an
+exact test. build_geocoder does the same from any boundaries GeoDataFrame
+with one STRtree per boundary type.
+
+Run it as a preprocessing stage whenever the point sources or boundaries
+change; it stores geo_state / geo_district for every row of each source's
+Parquet snapshot, which dataset_registry uses to fill missing states and
+districts at load time (no location resolving at request time):
+
+    python reverse_geocoder.py
+"""
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from boundary_store import (BOUNDARY_FILES, BOUNDARY_TYPES, boundaries_available, boundary_version,
+                            grid_query, load_boundary_store, store_version)
+from coordinates import parse_coordinate
+from dataset_registry import DATASETS, REGIONS_SNAPSHOT, read_source
+from snapshot_cache import write_snapshot_columns
+
+
+def build_geocoder(boundaries):
+    """Prepared STRtree, names and parent state names per boundary type of load_boundaries()"""
+    geocoder = {}
+    for boundary_type in BOUNDARY_TYPES:
+        rows = boundaries[boundaries["boundary_type"] == boundary_type]
+        geometries = np.asarray(rows.geometry.values, dtype=object)
+        invalid = ~shapely.is_valid(geometries)
+        geometries[invalid] = shapely.make_valid(geometries[invalid])
+        shapely.prepare(geometries)
+        state_names = rows["state_name"] if "state_name" in rows.columns else pd.Series(None, index=rows.index)
+        geocoder[boundary_type] = {
+            "tree": shapely.STRtree(geometries),
+            "names": rows["name"].to_numpy(dtype=object),
+            "state_names": state_names.to_numpy(dtype=object),
+        }
+    return geocoder
+
+
+@lru_cache(maxsize=2)
+def _store_geocoder(version):
+    store = load_boundary_store()
+    attributes = store["attributes"]
+    shapely.prepare(store["geometries"])
+    geocoder = {}
+    for boundary_type in BOUNDARY_TYPES:
+        rows = store[boundary_type]["rows"]
+        geocoder[boundary_type] = {
+            "store": store,
+            "boundary_type": boundary_type,
+            "geometries": store["geometries"][rows],
+            "names": attributes["name"].to_numpy(dtype=object)[rows],
+            "state_names": attributes["state_name"].to_numpy(dtype=object)[rows],
+        }
+    return geocoder
+
+
+def load_geocoder():
+    """Geocoder over the compiled boundary store and its grid index (shared, nothing to build per call)"""
+    load_boundary_store()
+    return _store_geocoder(store_version())
+
+
+def _first_match(index, points):
+    """Position of the first boundary containing each point (-1 if none)"""
+    if "tree" in index:
+        point_idx, geom_idx = index["tree"].query(points, predicate="intersects")
+    else:
+        point_idx, geom_idx = grid_query(index["store"], index["boundary_type"],
+                                         shapely.get_x(points), shapely.get_y(points))
+        hit = shapely.intersects(index["geometries"][geom_idx], points[point_idx])
+        point_idx, geom_idx = point_idx[hit], geom_idx[hit]
+    order = np.lexsort((geom_idx, point_idx))
+    point_idx, geom_idx = point_idx[order], geom_idx[order]
+    first = np.r_[True, point_idx[1:] != point_idx[:-1]] if len(point_idx) else np.zeros(0, dtype=bool)
+    match = np.full(len(points), -1, dtype="int64")
+    match[point_idx[first]] = geom_idx[first]
+    return match
+
+
+def _names(values, match):
+    return np.where(match >= 0, values[np.maximum(match, 0)] if len(values) else None, None)
+
+
+def reverse_geocode(geocoder, lon, lat):
+    """
+    State and district of every (lon, lat) point as a DataFrame with geo_state
+    and geo_district (None where no boundary contains the point). States come
+    from the state polygons, or from the district's state name when no state
+    polygon matches.
+    """
+    points = shapely.points(np.asarray(lon, dtype="float64"), np.asarray(lat, dtype="float64"))
+    district = _first_match(geocoder["district"], points)
+    state = _first_match(geocoder["state"], points)
+    geo_state = _names(geocoder["state"]["names"], state)
+    district_state = _names(geocoder["district"]["state_names"], district)
+    return pd.DataFrame({
+        "geo_state": np.where(pd.isna(geo_state), district_state, geo_state),
+        "geo_district": _names(geocoder["district"]["names"], district),
+    })
+
+
+def geocode_sources(geocoder, sources=None):
+    """Reverse geocode every row of each source and store the result with its snapshot"""
+    version = boundary_version()
+    for source in sources or DATASETS:
+        spec = DATASETS[source]
+        if not os.path.exists(spec["file"]):
+            print(f"⚠️ File {spec['file']} not found, skipping...")
+            continue
+        raw = read_source(source)
+        regions = reverse_geocode(geocoder, parse_coordinate(raw[spec["lon"]]), parse_coordinate(raw[spec["lat"]]))
+        write_snapshot_columns(spec["file"], REGIONS_SNAPSHOT, regions, boundaries=version)
+        print(f"✅ {source}: {int(regions['geo_district'].notna().sum())} of {len(regions)} rows matched a district")
+
+
+if __name__ == "__main__":
+    if not boundaries_available():
+        print(f"❌ Boundary files {BOUNDARY_FILES} not found; point snapshots were not geocoded.")
+    else:
+        geocode_sources(load_geocoder())
@@ -1,4 +1,5 @@
 import pandas as pd
+from coordinates import parse_lat_lon_pairs
 
 # Read the Excel file
 INPUT_FILE = 'Untitled spreadsheet (1).xlsx'
@@ -11,25 +12,6 @@ print("Original columns:", df.columns.tolist())
 print("\nFirst few rows of original data:")
 print(df.head())
 
-# Function to extract coordinates
-def extract_coordinates(row):
-    try:
-        # Convert to string and clean up
-        coords = str(row).strip()
-        # Split by comma and clean each part
-        parts = [p.strip() for p in coords.split(',')]
-        
-        if len(parts) >= 2:
-            # Take first two parts as lat and lon
-            lat = float(parts[0])
-            lon = float(parts[1])
-            return pd.Series({'Latitude': lat, 'Longitude': lon})
-        else:
-            return pd.Series({'Latitude': None, 'Longitude': None})
-    except Exception as e:
-        print(f"Error processing coordinates: {row} - {str(e)}")
-        return pd.Series({'Latitude': None, 'Longitude': None})
-
 # Find columns containing coordinates
 coord_cols = [col for col in df.columns if any(x in col.lower() for x in ['lat', 'lon', 'coordinate'])]
 
@@ -41,10 +23,15 @@ if coord_cols:
         print("Sample values:")
         print(df[col].head())
         
-        # Extract coordinates
-        new_coords = df[col].apply(extract_coordinates)
-        df[f'Clean_Lat_{col}'] = new_coords['Latitude']
-        df[f'Clean_Lon_{col}'] = new_coords['Longitude']
+        # Extract coordinates for the whole column at once
+        new_coords = parse_lat_lon_pairs(df[col])
+        df[f'Clean_Lat_{col}'] = new_coords['latitude']
+        df[f'Clean_Lon_{col}'] = new_coords['longitude']
+
+        failed = df[col].notna() & new_coords.isna().any(axis=1)
+        if failed.any():
+            print(f"Could not parse {failed.sum()} coordinates in {col}:")
+            print(df.loc[failed, col].to_string())
 
 # Save to new file
 df.to_excel(OUTPUT_FILE, index=False)
@@ -0,0 +1,182 @@
+"""
+Columnar snapshot cache for the Excel/CSV point sources.
+Each source file is converted once to a typed Parquet file under .snapshots/,
+keyed by the source file's size, mtime and content hash, so cold starts read
+Parquet instead of re-parsing the spreadsheet. A snapshot is rebuilt only when
+the source content (or the way it is read) changes.
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+import pandas as pd
+
+SNAPSHOT_DIR = ".snapshots"
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Return the sha256 hex digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _snapshot_paths(source_path):
+    base = os.path.basename(source_path)
+    return (os.path.join(SNAPSHOT_DIR, f"{base}.parquet"),
+            os.path.join(SNAPSHOT_DIR, f"{base}.meta.json"))
+
+
+def _reader_key(reader, reader_kwargs):
+    """Identify how a source is read so a change in columns/dtypes invalidates the snapshot"""
+    name = getattr(reader, "__name__", repr(reader))
+    return f"{name}:{json.dumps(reader_kwargs, sort_keys=True, default=str)}"
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = f"{meta_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, meta_path)
+
+
+def _write_parquet(df, parquet_path):
+    """Write df atomically; mixed-type object columns are stored as strings"""
+    tmp_path = f"{parquet_path}.tmp"
+    try:
+        df.to_parquet(tmp_path, index=False)
+    except Exception:
+        df = df.copy()
+        for col in df.columns:
+            if df[col].dtype == object:
+                df[col] = df[col].astype("string")
+        df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, parquet_path)
+
+
+def snapshot_meta(source_path):
+    """Return the metadata recorded for a source's snapshot ({} if none exists yet)"""
+    return _read_meta(_snapshot_paths(source_path)[1])
+
+
+def read_snapshot(source_path, reader, **reader_kwargs):
+    """
+    Load source_path through its Parquet snapshot.
+    The snapshot is reused while the source's size and mtime are unchanged; if
+    they moved (e.g. after a redeploy) the content hash decides whether the
+    source really changed. Only then is reader(source_path, **reader_kwargs)
+    called and the snapshot rewritten.
+    """
+    parquet_path, meta_path = _snapshot_paths(source_path)
+    stat = os.stat(source_path)
+    reader_key = _reader_key(reader, reader_kwargs)
+    meta = _read_meta(meta_path)
+    snapshot_ok = os.path.exists(parquet_path) and meta.get("reader") == reader_key
+
+    if snapshot_ok and meta.get("size") == stat.st_size and meta.get("mtime_ns") == stat.st_mtime_ns:
+        return pd.read_parquet(parquet_path)
+
+    digest = file_hash(source_path)
+    if snapshot_ok and meta.get("sha256") == digest:
+        # Same content, only the file stat moved: refresh the key and reuse
+        meta.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        try:
+            _write_meta(meta_path, meta)
+        except OSError:
+            pass
+        return pd.read_parquet(parquet_path)
+
+    df = reader(source_path, **reader_kwargs)
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        _write_parquet(df, parquet_path)
+        _write_meta(meta_path, {
+            "source": source_path,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+            "reader": reader_key,
+            "rows": len(df),
+        })
+    except Exception as e:
+        print(f"⚠️ Could not write snapshot for {source_path}: {e}")
+    return df
+
+
+def _columns_paths(source_path, name):
+    base = os.path.basename(source_path)
+    return (os.path.join(SNAPSHOT_DIR, f"{base}.{name}.parquet"),
+            os.path.join(SNAPSHOT_DIR, f"{base}.{name}.meta.json"))
+
+
+def write_snapshot_columns(source_path, name, df, **meta):
+    """
+    Store derived per-row columns (e.g. reverse-geocoded regions) next to the
+    snapshot of source_path. Rows must be aligned with read_snapshot's frame;
+    the columns are tied to the snapshot's content hash.
+    """
+    parquet_path, meta_path = _columns_paths(source_path, name)
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    _write_parquet(df, parquet_path)
+    _write_meta(meta_path, {
+        "source": source_path,
+        "sha256": snapshot_meta(source_path).get("sha256"),
+        "rows": len(df),
+        **meta,
+    })
+
+
+def read_snapshot_columns(source_path, name, **expected):
+    """
+    Derived columns stored for the current snapshot of source_path, or None if
+    missing or stale. Keyword arguments are meta entries (as passed to
+    write_snapshot_columns) that must still match, e.g. the inputs' versions.
+    """
+    parquet_path, meta_path = _columns_paths(source_path, name)
+    meta = _read_meta(meta_path)
+    if not meta or meta.get("sha256") != snapshot_meta(source_path).get("sha256") or not os.path.exists(parquet_path):
+        return None
+    if any(meta.get(key) != json.loads(json.dumps(value)) for key, value in expected.items()):
+        return None
+    df = pd.read_parquet(parquet_path)
+    return df if len(df) == meta.get("rows") else None
+
+
+def snapshot_columns_version(source_path, name):
+    """Cheap version key of stored derived columns (None when there are none)"""
+    try:
+        return os.stat(_columns_paths(source_path, name)[0]).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _reader_for(path):
+    return pd.read_csv if path.lower().endswith(".csv") else pd.read_excel
+
+
+if __name__ == "__main__":
+    # Warm the snapshots after a deploy: python snapshot_cache.py file.xlsx ...
+    sources = sys.argv[1:] or [
+        "steel_plant_data.xlsx",
+        "steel_plant_bf.xlsx",
+        "geocoded_combined_companies.xlsx",
+        "ricemills.csv",
+    ]
+    for path in sources:
+        if not os.path.exists(path):
+            print(f"⚠️ File {path} not found, skipping...")
+            continue
+        df = read_snapshot(path, _reader_for(path))
+        print(f"✅ Snapshot ready for {path} ({len(df)} rows)")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Cold-start profile for app.py.
+Runs app.py's module-level imports in a fresh interpreter with -X importtime,
+prints the slowest modules and exits non-zero when the cold import time goes
+over the budget, so an eager section-specific import creeping back into the
+top of app.py is caught before deploy:
+
+    python startup_profile.py --budget 2.0
+
+Inside the app, `timed(label, timings)` records how long each dashboard stage
+took on the current rerun for the timing panel.
+"""
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+DEFAULT_BUDGET_SECONDS = 2.0
+
+
+@contextmanager
+def timed(label, timings):
+    """Record the wall time of the with-block in timings[label] (seconds)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[label] = time.perf_counter() - start
+
+
+def top_level_imports(app_file=APP_FILE):
+    """Source of the import statements executed at app.py module level"""
+    with open(app_file, "r") as f:
+        tree = ast.parse(f.read(), filename=app_file)
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(node) for node in imports)
+
+
+def _importtime(code, cwd):
+    """Run code under -X importtime; returns (stdout, [(cumulative seconds, module), ...])"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing app.py dependencies failed:\n{result.stderr}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Only modules imported directly (no nesting indent)
+        if not name.startswith("  ") and name.strip():
+            modules.append((int(cumulative) / 1e6, name.strip()))
+    return result.stdout, modules
+
+
+def profile_cold_imports(app_file=APP_FILE):
+    """
+    Execute app.py's top-level imports in a fresh interpreter.
+    Returns (wall seconds, [(cumulative seconds, module), ...] for top-level modules).
+    """
+    code = (
+        "import time\n"
+        "_start = time.perf_counter()\n"
+        f"{top_level_imports(app_file)}\n"
+        "print(time.perf_counter() - _start)\n"
+    )
+    cwd = os.path.dirname(app_file)
+    stdout, modules = _importtime(code, cwd)
+    # Leave out what the bare interpreter imports before app.py's code runs
+    _, baseline = _importtime("pass", cwd)
+    interpreter_modules = {name for _, name in baseline}
+    modules = [(seconds, name) for seconds, name in modules if name not in interpreter_modules]
+    wall = float(stdout.strip().splitlines()[-1])
+    return wall, sorted(modules, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile app.py cold import time")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help="Fail when cold imports take longer than this many seconds")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules to show")
+    args = parser.parse_args()
+
+    wall, modules = profile_cold_imports()
+    print(f"⏱️ Cold import of app.py dependencies: {wall:.3f}s (budget {args.budget:.3f}s)")
+    for seconds, name in modules[:args.top]:
+        print(f"   {seconds:7.3f}s  {name}")
+
+    if wall > args.budget:
+        print(f"❌ Startup budget exceeded by {wall - args.budget:.3f}s")
+        sys.exit(1)
+    print("✅ Within startup budget")
+
+
+if __name__ == "__main__":
+    main()
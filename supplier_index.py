@@ -0,0 +1,76 @@
+"""
+Nearest-neighbour index between point sources, e.g. rice mills supplying
+steel plants. Sites are indexed as unit-sphere XYZ vectors in a KD-tree, where
+straight-line (chord) distance orders points exactly like great-circle
+distance, so k-nearest and radius queries for whole batches of locations run
+in the tree instead of a double loop. Trees are cached per set of sources and
+dataset version.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from dataset_registry import load_points, points_version
+from geodesy import chord_for_km, km_for_chord, unit_vectors
+
+SUPPLIER_SOURCES = ("Rice Mills",)
+
+
+@lru_cache(maxsize=8)
+def _site_tree(sources, sites_version):
+    # scipy.spatial is slow to import; load it only when a tree is first needed
+    from scipy.spatial import cKDTree
+
+    points = load_points()
+    rows = np.flatnonzero(points["source_type"].isin(sources).to_numpy())
+    xyz = unit_vectors(points["longitude"].to_numpy()[rows], points["latitude"].to_numpy()[rows])
+    return cKDTree(xyz), rows
+
+
+def site_tree(sources):
+    """(cKDTree, rows): tree over the load_points() rows of the given sources (cached per version)"""
+    return _site_tree(tuple(sources), points_version())
+
+
+def nearest_sites(sources, lon, lat, k=5):
+    """
+    k nearest sites of the given sources for every query location.
+    Returns (distance_km, rows), both shaped (n, k); rows index load_points()
+    and are -1 where fewer than k sites exist.
+    """
+    tree, rows = site_tree(sources)
+    if not len(rows):
+        shape = (len(np.atleast_1d(lon)), k)
+        return np.full(shape, np.inf), np.full(shape, -1)
+    chord, position = tree.query(unit_vectors(lon, lat), k=k)
+    chord = np.asarray(chord).reshape(-1, k)
+    position = np.asarray(position).reshape(-1, k)
+    found = position < len(rows)
+    return np.where(found, km_for_chord(np.where(found, chord, 0)), np.inf), np.where(found, rows[np.minimum(position, len(rows) - 1)], -1)
+
+
+def sites_within(sources, lon, lat, radius_km):
+    """
+    Every (query, site) pair within radius_km, as flat arrays
+    (query position, load_points() row, distance_km).
+    """
+    tree, rows = site_tree(sources)
+    matches = tree.query_ball_point(unit_vectors(lon, lat), r=float(chord_for_km(radius_km)))
+    counts = np.fromiter((len(m) for m in matches), dtype="int64", count=len(matches))
+    query = np.repeat(np.arange(len(matches)), counts)
+    position = np.fromiter((p for m in matches for p in m), dtype="int64", count=int(counts.sum()))
+    lon = np.broadcast_to(np.asarray(lon, dtype="float64"), len(matches))[query]
+    lat = np.broadcast_to(np.asarray(lat, dtype="float64"), len(matches))[query]
+    site = unit_vectors(lon, lat)
+    chord = np.linalg.norm(tree.data[position] - site, axis=1)
+    return query, rows[position], km_for_chord(chord)
+
+
+def top_suppliers(plant, n=10, sources=SUPPLIER_SOURCES):
+    """The n nearest supplier sites to a load_points() row, with distance_km"""
+    points = load_points()
+    distance, rows = nearest_sites(sources, points.at[plant, "longitude"], points.at[plant, "latitude"], k=n)
+    found = rows[0] >= 0
+    suppliers = points.loc[rows[0][found], ["source_type", "name", "state", "district"]]
+    return suppliers.assign(distance_km=np.round(distance[0][found], 2))